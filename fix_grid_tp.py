@@ -13,63 +13,150 @@ from core.vault_config import vault_manager
 # os.environ['VAULT_TOKEN'] = 'your-vault-token'
 # os.environ['VAULT_ADDR'] = 'https://vault.profithits.app:8200'
 
-async def fix_grid_positions():
-    """Fix GRID account positions to have 4% TP"""
-    print("Fixing GRID account positions to 4% TP...")
-    
+# Target TP distance from entry, as a price multiplier per position side
+TP_FACTORS = {
+    'POSITION_TYPE_BUY': 1.04,   # 4% above entry
+    'POSITION_TYPE_SELL': 0.96,  # 4% below entry
+}
+
+# TP rounding precision by symbol; anything not listed uses DEFAULT_DECIMALS
+SYMBOL_DECIMALS = {'BTCUSD': 2, 'ETHUSD': 2}
+DEFAULT_DECIMALS = 5
+
+# Seconds between passes when running continuously (0 = single pass)
+FIX_INTERVAL = int(os.getenv('GRID_TP_FIX_INTERVAL', '0'))
+
+class GridTPFixer:
+    """Keeps one synchronized MetaAPI connection and fixes GRID TPs on demand"""
+
+    def __init__(self, token: str, account_id: str):
+        self.meta_api = MetaApi(token)
+        self.account_id = account_id
+        self.connection = None
+
+    async def ensure_connected(self):
+        """Connect and synchronize once, then reuse the connection"""
+        if self.connection is not None:
+            return self.connection
+
+        account = await self.meta_api.metatrader_account_api.get_account(self.account_id)
+        connection = account.get_rpc_connection()
+        await connection.connect()
+        await connection.wait_synchronized()
+
+        self.connection = connection
+        return connection
+
+    async def run_once(self):
+        """Set every open position's TP to 4% from entry"""
+        try:
+            connection = await self.ensure_connected()
+
+            # Get current positions
+            positions = await connection.get_positions()
+        except Exception:
+            # Force a fresh handshake on the next pass
+            await self.close()
+            raise
+
+        # Fix positions concurrently; cap in-flight RPCs to stay under rate limits
+        semaphore = asyncio.Semaphore(8)
+
+        async def _fix(pos):
+            lines = [
+                f"\nProcessing {pos['symbol']} position {pos['id']}:",
+                f"  Open Price: {pos['openPrice']}",
+                f"  Current TP: {pos.get('takeProfit', 'None')}",
+            ]
+
+            # Calculate correct 4% TP, rounded to the symbol's precision
+            factor = TP_FACTORS.get(pos['type'], TP_FACTORS['POSITION_TYPE_SELL'])
+            new_tp = round(pos['openPrice'] * factor, SYMBOL_DECIMALS.get(pos['symbol'], DEFAULT_DECIMALS))
+
+            if pos.get('takeProfit') == new_tp:
+                lines.append(f"  TP already at {new_tp}, skipping")
+                return lines
+
+            lines.append(f"  New TP: {new_tp} (4% from entry)")
+
+            try:
+                # Modify position
+                async with semaphore:
+                    await connection.modify_position(
+                        position_id=pos['id'],
+                        take_profit=new_tp
+                    )
+                lines.append(f"  ✅ Successfully updated TP to {new_tp}")
+            except Exception as e:
+                lines.append(f"  ❌ Failed to update: {e}")
+
+            return lines
+
+        results = await asyncio.gather(*[_fix(pos) for pos in positions], return_exceptions=True)
+
+        # Print buffered output in position order
+        for pos, result in zip(positions, results):
+            if isinstance(result, Exception):
+                print(f"\nProcessing {pos.get('symbol')} position {pos.get('id')}:")
+                print(f"  ❌ Failed to update: {result}")
+                continue
+            for line in result:
+                print(line)
+
+    async def close(self):
+        """Close the connection if one is open"""
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            await connection.close()
+
+
+def create_fixer():
+    """Build a GridTPFixer from Vault credentials, or None if unavailable"""
     # Get MetaAPI credentials
     metaapi_creds = vault_manager.get_metaapi_credentials()
     if not metaapi_creds:
         print("Failed to get MetaAPI credentials")
-        return
-    
+        return None
+
     token = metaapi_creds.get('token')
     grid_account_id = metaapi_creds.get('grid_demo_account_id', '019ec0f0-09f5-4230-a7bd-fa2930af07a4')
-    
-    # Initialize MetaAPI
-    meta_api = MetaApi(token)
-    account = await meta_api.metatrader_account_api.get_account(grid_account_id)
-    
-    # Connect to account
-    connection = account.get_rpc_connection()
-    await connection.connect()
-    await connection.wait_synchronized()
-    
-    # Get current positions
-    positions = await connection.get_positions()
-    
-    # Fix each position
-    for pos in positions:
-        print(f"\nProcessing {pos['symbol']} position {pos['id']}:")
-        print(f"  Open Price: {pos['openPrice']}")
-        print(f"  Current TP: {pos.get('takeProfit', 'None')}")
-        
-        # Calculate correct 4% TP
-        if pos['type'] == 'POSITION_TYPE_BUY':
-            new_tp = pos['openPrice'] * 1.04  # 4% above entry
-        else:  # SELL
-            new_tp = pos['openPrice'] * 0.96  # 4% below entry
-        
-        # Round to appropriate decimal places
-        if pos['symbol'] in ['BTCUSD', 'ETHUSD']:
-            new_tp = round(new_tp, 2)
-        else:
-            new_tp = round(new_tp, 5)
-        
-        print(f"  New TP: {new_tp} (4% from entry)")
-        
-        try:
-            # Modify position
-            result = await connection.modify_position(
-                position_id=pos['id'],
-                take_profit=new_tp
-            )
-            print(f"  ✅ Successfully updated TP to {new_tp}")
-        except Exception as e:
-            print(f"  ❌ Failed to update: {e}")
-    
-    await connection.close()
+
+    return GridTPFixer(token, grid_account_id)
+
+async def fix_grid_positions():
+    """Fix GRID account positions to have 4% TP"""
+    print("Fixing GRID account positions to 4% TP...")
+
+    fixer = create_fixer()
+    if not fixer:
+        return
+
+    try:
+        await fixer.run_once()
+    finally:
+        await fixer.close()
     print("\n✅ GRID position fix complete")
 
+async def watch_grid_positions(interval: int):
+    """Keep fixing GRID TPs every interval seconds over one persistent connection"""
+    print(f"Watching GRID account positions every {interval}s...")
+
+    fixer = create_fixer()
+    if not fixer:
+        return
+
+    try:
+        while True:
+            try:
+                await fixer.run_once()
+            except Exception as e:
+                print(f"❌ GRID position fix pass failed: {e}")
+            await asyncio.sleep(interval)
+    finally:
+        await fixer.close()
+
 if __name__ == "__main__":
-    asyncio.run(fix_grid_positions())
+    if FIX_INTERVAL > 0:
+        asyncio.run(watch_grid_positions(FIX_INTERVAL))
+    else:
+        asyncio.run(fix_grid_positions())
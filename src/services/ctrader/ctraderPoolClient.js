@@ -5,6 +5,7 @@
  */
 
 import axios from 'axios';
+import http from 'http';
 import { logger } from '../../utils/logger.js';
 
 class CTraderPoolClient {
@@ -13,6 +14,8 @@ class CTraderPoolClient {
     this.client = axios.create({
       baseURL: poolUrl,
       timeout: 30000,
+      // Reuse sockets; the pool API keeps idle connections open for 75s
+      httpAgent: new http.Agent({ keepAlive: true }),
       headers: {
         'Content-Type': 'application/json'
       }
@@ -6,32 +6,46 @@ Runs on port 8088 (8089 for internal pool operations)
 """
 
 import asyncio
+import functools
 import logging
 import os
 import json
-from collections import defaultdict
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, List
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ConfigDict
+import orjson
 import uvicorn
 
 # Setup logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    force=True
+)
 logger = logging.getLogger(__name__)
 
 # Models for API requests/responses
-class AccountRequest(BaseModel):
+class RequestModel(BaseModel):
+    """Base for request bodies: unknown fields dropped, no revalidation on assignment"""
+    model_config = ConfigDict(extra='ignore', validate_assignment=False)
+
+class AccountRequest(RequestModel):
     account_id: str
     environment: str = 'demo'
 
-class PositionRequest(BaseModel):
+class PositionRequest(RequestModel):
     account_id: str
     environment: str = 'demo'
 
-class TradeRequest(BaseModel):
+class TradeRequest(RequestModel):
     account_id: str
     environment: str = 'demo'
     symbol: str
@@ -43,114 +57,245 @@ class TradeRequest(BaseModel):
     comment: Optional[str] = ''
     clientId: Optional[str] = ''
 
-class ModifyPositionRequest(BaseModel):
+class ModifyPositionRequest(RequestModel):
     account_id: str
     environment: str = 'demo'
     position_id: str
     stop_loss: Optional[float] = None
     take_profit: Optional[float] = None
 
-class ClosePositionRequest(BaseModel):
+class ClosePositionRequest(RequestModel):
     account_id: str
     environment: str = 'demo'
     position_id: str
 
-class SubscribeRequest(BaseModel):
+class SubscribeRequest(RequestModel):
     symbol: str
     account_id: Optional[str] = None
 
+# Connection pool, bound once at startup and shared by all handlers
+pool = None
+# Set once the pool has initialized; probes short-circuit until then
+_pool_ready = False
+
+# Stats reported while the pool is unavailable
+EMPTY_POOL_STATS = {
+    "connectionsCreated": 0,
+    "connectionsReused": 0,
+    "tradesExecuted": 0,
+    "errors": 0,
+    "activeConnections": 0
+}
+
 # Lifespan manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global pool, _pool_ready
+
     # Startup
     logger.info("🚀 Starting cTrader Connection Pool API...")
     # Initialize connection pool
     from services.ctrader_connection_pool import get_pool
     pool = get_pool()
-    await pool.initialize()
+    try:
+        await pool.initialize()
+    except Exception:
+        _pool_ready = False
+        raise
+    _pool_ready = True
 
     yield
 
     # Shutdown
     logger.info("🛑 Shutting down cTrader Connection Pool...")
+    _pool_ready = False
     await pool.cleanup()
 
+class ORJSONRoute(APIRoute):
+    """APIRoute that decodes JSON request bodies with orjson"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request):
+            body = await request.body()
+            if body:
+                try:
+                    # Starlette's request.json() returns this instead of re-parsing
+                    request._json = orjson.loads(body)
+                except orjson.JSONDecodeError:
+                    # Leave invalid bodies to FastAPI so it reports the usual 422
+                    pass
+            return await handler(request)
+
+        return orjson_route_handler
+
 # Create FastAPI app
-app = FastAPI(title="cTrader Connection Pool API", lifespan=lifespan)
+app = FastAPI(
+    title="cTrader Connection Pool API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# Routes declared below parse request bodies with orjson
+app.router.route_class = ORJSONRoute
 
-# Import pool after app creation
-from services.ctrader_connection_pool import get_pool
+# Compress larger JSON payloads (positions, orders, trades, prices)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# The pool module (and the cTrader Open API stack) is only imported in lifespan
 from services.ctrader_data_mapper import CTraderDataMapper
+from services.ctrader_single_flight import single_flight
 
 # Initialize data mapper
 data_mapper = CTraderDataMapper()
 
+# Short-lived price caches so UI polling collapses into one pool call per tick
+PRICE_CACHE_TTL = 0.2  # seconds
+_price_cache: Dict[str, tuple] = {}
+# One lock per mapped symbol; unknown symbols never reach the pool
+_price_locks: Dict[str, asyncio.Lock] = {symbol: asyncio.Lock() for symbol in data_mapper.symbol_ids}
+_all_prices_cache: Optional[tuple] = None
+_all_prices_lock = asyncio.Lock()
+
+# In-flight idempotent reads, keyed by (operation, account_id, environment)
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+# Share one pool call between concurrent identical read requests
+_single_flight = functools.partial(single_flight, _inflight)
+
+# Lists longer than this are streamed item by item instead of encoded in one go
+STREAM_THRESHOLD = 50
+
+# Batches longer than this are mapped in a worker thread to keep the loop responsive
+MAP_OFFLOAD_THRESHOLD = 200
+
+async def _map_batch(mapper, items: List) -> List[Dict]:
+    """Run a data_mapper batch method, off the event loop for large batches"""
+    if len(items) > MAP_OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(mapper, items)
+    return mapper(items)
+
+# Entries kept per response cache; least recently used keys go first
+RESPONSE_CACHE_SIZE = 256
+
+def _cache_get(cache: OrderedDict, key: tuple):
+    """Get a response cache entry, marking it most recently used"""
+    entry = cache.get(key)
+    if entry is not None:
+        cache.move_to_end(key)
+    return entry
+
+def _cache_put(cache: OrderedDict, key: tuple, entry: tuple):
+    """Store a response cache entry, evicting the least recently used past the cap"""
+    cache[key] = entry
+    cache.move_to_end(key)
+    if len(cache) > RESPONSE_CACHE_SIZE:
+        cache.popitem(last=False)
+
+# Last mapped result per (operation, account_id, environment). The pool hands
+# out the same snapshot tuple until an event changes the cache, so the
+# snapshot's identity is the change signature.
+_mapped_cache: OrderedDict = OrderedDict()
+
+async def _map_cached(key: tuple, mapper, items) -> List[Dict]:
+    """Map items, reusing the previous result if the pool snapshot is unchanged"""
+    cached = _cache_get(_mapped_cache, key)
+    if cached is not None and cached[0] is items:
+        return cached[1]
+
+    mapped = await _map_batch(mapper, items)
+    if isinstance(items, tuple):
+        _cache_put(_mapped_cache, key, (items, mapped))
+    return mapped
+
+async def _stream_list(key: str, items: List):
+    """Yield {"<key>": [...], "count": N} as orjson-encoded chunks"""
+    yield b'{"' + key.encode() + b'":['
+    for i, item in enumerate(items):
+        yield (b',' if i else b'') + orjson.dumps(item)
+    yield b'],"count":' + str(len(items)).encode() + b'}'
+
+# Encoded body per cache key for the last mapped list it was built from;
+# an unchanged list is served without re-encoding
+_encoded_cache: OrderedDict = OrderedDict()
+
+def _list_response(key: str, items: List, cache_key: Optional[tuple] = None, stream: bool = True):
+    """Stream large lists, encode small ones in a single response"""
+    if stream and len(items) > STREAM_THRESHOLD:
+        return StreamingResponse(_stream_list(key, items), media_type="application/json")
+    if cache_key is None:
+        return ORJSONResponse(content={key: items, "count": len(items)})
+
+    cached = _cache_get(_encoded_cache, cache_key)
+    if cached is not None and cached[0] is items:
+        body = cached[1]
+    else:
+        body = orjson.dumps({key: items, "count": len(items)})
+        _cache_put(_encoded_cache, cache_key, (items, body))
+    return Response(content=body, media_type="application/json")
+
 # ============= ACCOUNT OPERATIONS =============
 
 @app.get("/account/{account_id}")
 async def get_account_info(account_id: str, environment: str = 'demo'):
     """Get account information"""
     try:
-        pool = get_pool()
-        account_info = await pool.get_account_info(account_id, environment)
+        account_info = await _single_flight(
+            ('account', account_id, environment),
+            lambda: pool.get_account_info(account_id, environment)
+        )
 
         if account_info:
             return data_mapper.map_account_info(account_info)
         else:
             raise HTTPException(status_code=404, detail="Account not found")
     except Exception as e:
-        logger.error(f"Failed to get account info: {e}")
+        logger.error("Failed to get account info: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/positions/{account_id}")
 async def get_positions(account_id: str, environment: str = 'demo'):
     """Get all open positions"""
     try:
-        pool = get_pool()
-        positions = await pool.get_positions(account_id, environment)
+        positions = await _single_flight(
+            ('positions', account_id, environment),
+            lambda: pool.get_positions(account_id, environment)
+        )
 
         # Map to MetaAPI format
-        mapped_positions = [data_mapper.map_position(pos) for pos in positions]
+        cache_key = ('positions', account_id, environment)
+        mapped_positions = await _map_cached(cache_key, data_mapper.map_positions, positions)
 
-        return {"positions": mapped_positions, "count": len(mapped_positions)}
+        # Mapped positions are plain dicts, skip jsonable_encoder
+        return _list_response("positions", mapped_positions, cache_key)
     except Exception as e:
-        logger.error(f"Failed to get positions: {e}")
+        logger.error("Failed to get positions: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============= TRADING OPERATIONS =============
 
-@app.post("/trade/execute")
+@app.post("/trade/execute", response_model=None, response_class=ORJSONResponse)
 async def execute_trade(request: TradeRequest):
     """Execute a market order"""
     try:
-        pool = get_pool()
-
-        # Execute trade
+        # Execute trade with the validated fields, dropping unset optionals
         result = await pool.execute_trade(
             request.account_id,
             request.environment,
-            {
-                'symbol': request.symbol,
-                'actionType': request.actionType,
-                'volume': request.volume,
-                'stopLoss': request.stopLoss,
-                'takeProfit': request.takeProfit,
-                'comment': request.comment,
-                'clientId': request.clientId
-            }
+            request.model_dump(exclude={'account_id', 'environment'}, exclude_none=True)
         )
 
-        return result
+        # Pool results are plain dicts, return them without re-validation
+        return ORJSONResponse(content=result)
     except Exception as e:
-        logger.error(f"Failed to execute trade: {e}")
-        return {"success": False, "error": str(e)}
+        logger.error("Failed to execute trade: %s", e)
+        return ORJSONResponse(content={"success": False, "error": str(e)})
 
-@app.post("/position/modify")
+@app.post("/position/modify", response_model=None, response_class=ORJSONResponse)
 async def modify_position(request: ModifyPositionRequest):
     """Modify position SL/TP"""
     try:
-        pool = get_pool()
-
         success = await pool.modify_position(
             request.account_id,
             request.environment,
@@ -159,27 +304,25 @@ async def modify_position(request: ModifyPositionRequest):
             request.take_profit
         )
 
-        return {"success": success}
+        return ORJSONResponse(content={"success": success})
     except Exception as e:
-        logger.error(f"Failed to modify position: {e}")
-        return {"success": False, "error": str(e)}
+        logger.error("Failed to modify position: %s", e)
+        return ORJSONResponse(content={"success": False, "error": str(e)})
 
-@app.post("/position/close")
+@app.post("/position/close", response_model=None, response_class=ORJSONResponse)
 async def close_position(request: ClosePositionRequest):
     """Close a position"""
     try:
-        pool = get_pool()
-
         success = await pool.close_position(
             request.account_id,
             request.environment,
             request.position_id
         )
 
-        return {"success": success}
+        return ORJSONResponse(content={"success": success})
     except Exception as e:
-        logger.error(f"Failed to close position: {e}")
-        return {"success": False, "error": str(e)}
+        logger.error("Failed to close position: %s", e)
+        return ORJSONResponse(content={"success": False, "error": str(e)})
 
 # ============= STREAMING OPERATIONS =============
 
@@ -187,48 +330,72 @@ async def close_position(request: ClosePositionRequest):
 async def initialize_streaming(account_id: str, environment: str = 'demo'):
     """Initialize streaming connection"""
     try:
-        pool = get_pool()
         success = await pool.initialize_streaming(account_id, environment)
         return {"success": success}
     except Exception as e:
-        logger.error(f"Failed to initialize streaming: {e}")
+        logger.error("Failed to initialize streaming: %s", e)
         return {"success": False, "error": str(e)}
 
 @app.post("/streaming/subscribe")
 async def subscribe_to_symbol(request: SubscribeRequest):
     """Subscribe to symbol updates"""
     try:
-        pool = get_pool()
         success = await pool.subscribe_to_symbol(request.symbol, request.account_id)
         return {"success": success}
     except Exception as e:
-        logger.error(f"Failed to subscribe to symbol: {e}")
+        logger.error("Failed to subscribe to symbol: %s", e)
         return {"success": False, "error": str(e)}
 
 @app.get("/prices/{symbol}")
 async def get_price(symbol: str):
     """Get current price for symbol"""
     try:
-        pool = get_pool()
-        price_data = await pool.get_price(symbol)
+        cached = _price_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < PRICE_CACHE_TTL:
+            return cached[1]
+
+        lock = _price_locks.get(symbol)
+        if lock is None:
+            price_data = None
+        else:
+            async with lock:
+                # Another request may have refreshed the price while we waited
+                cached = _price_cache.get(symbol)
+                if cached and time.monotonic() - cached[0] < PRICE_CACHE_TTL:
+                    return cached[1]
+
+                price_data = await pool.get_price(symbol)
+                if price_data:
+                    _price_cache[symbol] = (time.monotonic(), price_data)
 
         if price_data:
             return price_data
         else:
             raise HTTPException(status_code=404, detail="Price not available")
     except Exception as e:
-        logger.error(f"Failed to get price: {e}")
+        logger.error("Failed to get price: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/prices")
 async def get_all_prices():
     """Get all current prices"""
+    global _all_prices_cache
     try:
-        pool = get_pool()
-        prices = await pool.get_all_prices()
-        return prices
+        cached = _all_prices_cache
+        if cached and time.monotonic() - cached[0] < PRICE_CACHE_TTL:
+            return ORJSONResponse(content=cached[1])
+
+        async with _all_prices_lock:
+            cached = _all_prices_cache
+            if cached and time.monotonic() - cached[0] < PRICE_CACHE_TTL:
+                return ORJSONResponse(content=cached[1])
+
+            prices = await pool.get_all_prices()
+            _all_prices_cache = (time.monotonic(), prices)
+
+        return ORJSONResponse(content=prices)
     except Exception as e:
-        logger.error(f"Failed to get prices: {e}")
+        logger.error("Failed to get prices: %s", e)
         return {}
 
 # ============= POOL MANAGEMENT =============
@@ -236,49 +403,63 @@ async def get_all_prices():
 @app.get("/pool/stats")
 async def get_pool_stats():
     """Get connection pool statistics"""
+    if not _pool_ready:
+        return EMPTY_POOL_STATS
+
     try:
-        pool = get_pool()
         return pool.get_stats()
     except Exception as e:
-        logger.error(f"Failed to get pool stats: {e}")
-        return {
-            "connectionsCreated": 0,
-            "connectionsReused": 0,
-            "tradesExecuted": 0,
-            "errors": 0,
-            "activeConnections": 0
-        }
+        logger.error("Failed to get pool stats: %s", e)
+        return EMPTY_POOL_STATS
 
 @app.get("/accounts/summary")
 async def get_accounts_summary():
     """Get summary of all accounts"""
     try:
-        pool = get_pool()
         return await pool.get_accounts_summary()
     except Exception as e:
-        logger.error(f"Failed to get accounts summary: {e}")
+        logger.error("Failed to get accounts summary: %s", e)
         return {}
 
 # ============= HEALTH CHECK =============
 
+# /health is polled by load balancers, so format its timestamp once per second
+_health_ts_sec = 0
+_health_ts_str = ''
+
+def _health_timestamp() -> str:
+    """Current UTC time as ISO string, cached at one second granularity"""
+    global _health_ts_sec, _health_ts_str
+    now = int(time.time())
+    if now != _health_ts_sec:
+        _health_ts_sec = now
+        _health_ts_str = datetime.fromtimestamp(now, timezone.utc).isoformat()
+    return _health_ts_str
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    if not _pool_ready:
+        return {
+            "status": "starting",
+            "service": "cTrader Connection Pool",
+            "timestamp": _health_timestamp()
+        }
+
     try:
-        pool = get_pool()
         stats = pool.get_stats()
 
         return {
             "status": "healthy",
             "service": "cTrader Connection Pool",
             "stats": stats,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _health_timestamp()
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _health_timestamp()
         }
 
 @app.get("/")
@@ -309,11 +490,13 @@ async def root():
 async def get_account_metrics(account_id: str):
     """Get account trading metrics"""
     try:
-        pool = get_pool()
-        metrics = await pool.get_account_metrics(account_id)
+        metrics = await _single_flight(
+            ('metrics', account_id, None),
+            lambda: pool.get_account_metrics(account_id)
+        )
         return metrics
     except Exception as e:
-        logger.error(f"Failed to get account metrics: {e}")
+        logger.error("Failed to get account metrics: %s", e)
         return {
             "trades": 0,
             "wonTrades": 0,
@@ -327,33 +510,30 @@ async def get_account_metrics(account_id: str):
 async def get_trade_history(account_id: str, days: int = 30, limit: int = 100):
     """Get trade history"""
     try:
-        pool = get_pool()
-        trades = await pool.get_trade_history(account_id, days, limit)
-        return trades
+        history = await pool.get_trade_history(account_id, days, limit)
+        return _list_response("trades", history.get('trades', []))
     except Exception as e:
-        logger.error(f"Failed to get trade history: {e}")
+        logger.error("Failed to get trade history: %s", e)
         return {"trades": [], "count": 0}
 
 @app.get("/accounts/{account_id}/daily-growth")
 async def get_daily_growth(account_id: str, days: int = 30):
     """Get daily growth data"""
     try:
-        pool = get_pool()
         growth = await pool.get_daily_growth(account_id, days)
         return {"growth": growth}
     except Exception as e:
-        logger.error(f"Failed to get daily growth: {e}")
+        logger.error("Failed to get daily growth: %s", e)
         return {"growth": []}
 
 @app.get("/accounts/{account_id}/risk-status")
 async def get_risk_status(account_id: str):
     """Get account risk status"""
     try:
-        pool = get_pool()
         risk = await pool.get_risk_status(account_id)
         return risk
     except Exception as e:
-        logger.error(f"Failed to get risk status: {e}")
+        logger.error("Failed to get risk status: %s", e)
         return {
             "drawdown": 0,
             "maxDrawdown": 0,
@@ -367,15 +547,19 @@ async def get_risk_status(account_id: str):
 async def get_pending_orders(account_id: str, environment: str = 'demo'):
     """Get all pending orders"""
     try:
-        pool = get_pool()
-        orders = await pool.get_orders(account_id, environment)
+        orders = await _single_flight(
+            ('orders', account_id, environment),
+            lambda: pool.get_orders(account_id, environment)
+        )
 
         # Map to MetaAPI format
-        mapped_orders = [data_mapper.map_order(order) for order in orders]
+        cache_key = ('orders', account_id, environment)
+        mapped_orders = await _map_cached(cache_key, data_mapper.map_orders, orders)
 
-        return {"orders": mapped_orders, "count": len(mapped_orders)}
+        # Mapped orders are plain dicts, skip jsonable_encoder
+        return _list_response("orders", mapped_orders, cache_key, stream=False)
     except Exception as e:
-        logger.error(f"Failed to get orders: {e}")
+        logger.error("Failed to get orders: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/symbols/mapping/{mt5_symbol}")
@@ -388,27 +572,35 @@ async def get_symbol_mapping(mt5_symbol: str):
         else:
             raise HTTPException(status_code=404, detail="Symbol mapping not found")
     except Exception as e:
-        logger.error(f"Failed to get symbol mapping: {e}")
+        logger.error("Failed to get symbol mapping: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/accounts/{account_id}/symbols")
 async def get_available_symbols(account_id: str):
     """Get available trading symbols"""
     try:
-        pool = get_pool()
         symbols = await pool.get_available_symbols(account_id)
         return {"symbols": symbols}
     except Exception as e:
-        logger.error(f"Failed to get available symbols: {e}")
+        logger.error("Failed to get available symbols: %s", e)
         return {"symbols": []}
 
 # Run the server
 if __name__ == "__main__":
     port = int(os.getenv('CTRADER_POOL_PORT', '8088'))
+    workers = int(os.getenv('CTRADER_POOL_WORKERS', '1'))
+    # Keep idle client connections open so pollers skip the TCP handshake
+    keep_alive = int(os.getenv('CTRADER_POOL_KEEPALIVE', '75'))
+    # For multi-process scaling behind gunicorn use:
+    #   gunicorn -k uvicorn.workers.UvicornWorker -w N ctrader_pool_api:app
     uvicorn.run(
         "ctrader_pool_api:app",
         host="0.0.0.0",
         port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        timeout_keep_alive=keep_alive,
         reload=False,
         log_level="info"
     )
\ No newline at end of file
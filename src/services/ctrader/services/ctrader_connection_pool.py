@@ -5,10 +5,15 @@ Manages multiple cTrader connections with reuse and health monitoring
 """
 
 import asyncio
+import contextlib
+import functools
+import heapq
 import logging
-from typing import Dict, Optional, List, Any
+import time
+import weakref
+from typing import Dict, Optional, List, Any, Literal, Sequence, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict
 
 try:
     from ctrader_open_api import Client, Protobuf, TcpProtocol, Auth, EndPoints
@@ -24,24 +29,95 @@ except ImportError:
 
 # Import data mapper
 from .ctrader_data_mapper import CTraderDataMapper
+from .ctrader_price_table import PriceTable
+from .ctrader_equity_history import EquityHistory
+from .ctrader_single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
+# Max concurrent account info requests when building the accounts summary
+SUMMARY_CONCURRENCY = 16
+
+# Per-account cap so one slow broker session cannot stall the whole summary
+SUMMARY_ACCOUNT_TIMEOUT = 5.0
+
+# Connections used within this many seconds are never evicted under MRU
+EVICTION_GRACE_SECONDS = 5
+
+# Position/order caches are kept current by push events; this only bounds
+# staleness if an event is missed
+EVENT_CACHE_SAFETY_TTL = 30
+
+# How long get_all_prices waits for first ticks after subscribing
+SPOT_SNAPSHOT_TIMEOUT = 1.0
+
+# Upper bound on closing every connection at shutdown
+CLEANUP_TIMEOUT = 5.0
+
+# Connection setup is serialised per shard of account keys (power of two)
+CONNECT_SHARDS = 8
+
+if HAS_CTRADER_API:
+    # Payload type ids of the pushed events _on_message handles
+    EXECUTION_EVENT_TYPE = ProtoOAExecutionEvent().payloadType
+    SPOT_EVENT_TYPE = ProtoOASpotEvent().payloadType
+    ORDER_ERROR_EVENT_TYPE = ProtoOAOrderErrorEvent().payloadType
+
+def _with_connection(action: str, default: Any = None):
+    """Run a pool method against the account's connection, returning default on error
+
+    The decorated method takes the connection in place of (account_id,
+    environment). default may be a callable, which is passed the exception.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, account_id: str, environment: str = 'demo', *args, **kwargs):
+            try:
+                conn = await self.get_connection(account_id, environment)
+                return await method(self, conn, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"Failed to {action}: {e}")
+                self.errors += 1
+                return default(e) if callable(default) else default
+        return wrapper
+    return decorator
+
 class CTraderConnectionWrapper:
     """Wrapper for individual cTrader connection"""
 
+    __slots__ = (
+        'account_id', 'environment', 'client', 'ctid_account_id', 'is_connected',
+        'last_used', 'connection_count', 'error_count', 'positions_cache',
+        'orders_cache', 'account_info_cache', 'cache_timestamp',
+        'positions_timestamp', 'orders_timestamp', '_inflight', 'on_spot',
+        'generation', 'reconcile_req', 'positions_snapshot', 'orders_snapshot'
+    )
+
     def __init__(self, account_id: str, environment: str = 'demo'):
         self.account_id = account_id
         self.environment = environment
         self.client = None
+        self.ctid_account_id = None
         self.is_connected = False
-        self.last_used = datetime.now()
+        # Cache/usage timestamps are time.monotonic() seconds
+        self.last_used = time.monotonic()
+        self.generation = 0  # Set by the pool; tags this wrapper's expiry entries
         self.connection_count = 0
         self.error_count = 0
-        self.positions_cache = {}
-        self.orders_cache = {}
+        # Allocated by the first reconcile; events before that are dropped
+        # since the reconcile snapshot supersedes them
+        self.positions_cache: Optional[Dict[int, Any]] = None
+        self.orders_cache: Optional[Dict[int, Any]] = None
+        # Tuples of the cache values, rebuilt on the first read after a change
+        self.positions_snapshot: Optional[Tuple[Any, ...]] = None
+        self.orders_snapshot: Optional[Tuple[Any, ...]] = None
         self.account_info_cache = None
         self.cache_timestamp = None
+        self.positions_timestamp = None
+        self.orders_timestamp = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.on_spot = None  # Called with (symbol_id, bid, ask) for pushed ticks; unsent sides are None
+        self.reconcile_req = None  # Built once on connect; only the account id varies
 
     async def connect(self, access_token: str, ctid_account_id: int):
         """Connect to cTrader account"""
@@ -60,6 +136,9 @@ class CTraderConnectionWrapper:
             # Set access token
             self.client.set_access_token(access_token)
 
+            # Keep position/order caches current from push events
+            self.client.setMessageReceivedCallback(self._on_message)
+
             # Connect
             await self.client.connect()
 
@@ -70,6 +149,8 @@ class CTraderConnectionWrapper:
 
             await self.client.send(auth_req)
 
+            self.ctid_account_id = ctid_account_id
+            self.reconcile_req = ProtoOAReconcileReq(ctidTraderAccountId=ctid_account_id)
             self.is_connected = True
             self.connection_count += 1
             logger.info(f"Connected to cTrader account {self.account_id}")
@@ -92,335 +173,506 @@ class CTraderConnectionWrapper:
         except Exception as e:
             logger.error(f"Error disconnecting cTrader: {e}")
 
+    def coalesce(self, key: str, fetch):
+        """Share one in-flight broker request between concurrent callers"""
+        return single_flight(self._inflight, key, fetch)
+
+    async def heartbeat(self):
+        """Send a heartbeat so the broker does not close an idle socket"""
+        if not HAS_CTRADER_API or not (self.client and self.is_connected):
+            return
+
+        await self.client.send(ProtoHeartbeatEvent())
+
     def update_last_used(self):
         """Update last used timestamp"""
-        self.last_used = datetime.now()
+        self.last_used = time.monotonic()
 
     def is_cache_valid(self, max_age_seconds: int = 1):
         """Check if cache is still valid"""
         if not self.cache_timestamp:
             return False
-        return (datetime.now() - self.cache_timestamp).total_seconds() < max_age_seconds
+        return time.monotonic() - self.cache_timestamp < max_age_seconds
+
+    def is_synced(self, timestamp: Optional[float]) -> bool:
+        """Check if an event-driven cache was reconciled recently enough"""
+        if not timestamp:
+            return False
+        return time.monotonic() - timestamp < EVENT_CACHE_SAFETY_TTL
+
+    def apply_reconcile(self, response: Any):
+        """Replace position and order caches from a reconcile response"""
+        now = time.monotonic()
+        self.positions_cache = {pos.positionId: pos for pos in response.position}
+        self.orders_cache = {order.orderId: order for order in response.order}
+        self.positions_timestamp = now
+        self.orders_timestamp = now
+        self.positions_snapshot = None
+        self.orders_snapshot = None
+
+    def positions(self) -> Tuple[Any, ...]:
+        """Cached positions as a tuple shared until the cache changes"""
+        if self.positions_snapshot is None:
+            self.positions_snapshot = tuple(self.positions_cache.values()) if self.positions_cache else ()
+        return self.positions_snapshot
+
+    def orders(self) -> Tuple[Any, ...]:
+        """Cached orders as a tuple shared until the cache changes"""
+        if self.orders_snapshot is None:
+            self.orders_snapshot = tuple(self.orders_cache.values()) if self.orders_cache else ()
+        return self.orders_snapshot
+
+    def _on_message(self, client: Any, message: Any):
+        """Apply pushed execution/order events to the caches"""
+        try:
+            payload_type = message.payloadType
+            if payload_type == EXECUTION_EVENT_TYPE:
+                event = Protobuf.extract(message)
+
+                if event.HasField('position') and self.positions_cache is not None:
+                    position = event.position
+                    if position.positionStatus == POSITION_STATUS_CLOSED:
+                        self.positions_cache.pop(position.positionId, None)
+                    else:
+                        self.positions_cache[position.positionId] = position
+                    self.positions_snapshot = None
+
+                if event.HasField('order') and self.orders_cache is not None:
+                    order = event.order
+                    if order.orderStatus == ORDER_STATUS_ACCEPTED:
+                        self.orders_cache[order.orderId] = order
+                    else:
+                        self.orders_cache.pop(order.orderId, None)
+                    self.orders_snapshot = None
+
+            elif payload_type == SPOT_EVENT_TYPE:
+                if self.on_spot:
+                    # A live price stream counts as use, so idle cleanup leaves it open
+                    self.last_used = time.monotonic()
+                    event = Protobuf.extract(message)
+                    # Ticks only carry the side of the quote that changed
+                    self.on_spot(event.symbolId,
+                                 event.bid if event.HasField('bid') else None,
+                                 event.ask if event.HasField('ask') else None)
+
+            elif payload_type == ORDER_ERROR_EVENT_TYPE:
+                if self.orders_cache is not None:
+                    event = Protobuf.extract(message)
+                    self.orders_cache.pop(event.orderId, None)
+                    self.orders_snapshot = None
+        except Exception as e:
+            logger.error(f"Failed to apply cTrader event for {self.account_id}: {e}")
 
 
 class CTraderConnectionPool:
-    """Connection pool for cTrader accounts"""
-
-    def __init__(self, max_connections: int = 50, idle_timeout: int = 300):
-        self.connections: Dict[str, CTraderConnectionWrapper] = {}
+    """Connection pool for cTrader accounts
+
+    When the pool is full, eviction_policy picks the connection to drop:
+    'mru' (default) evicts the most recently used idle connection, so
+    bursty hot accounts reconnect quickly while the long tail of colder
+    accounts keeps its warm broker socket; 'lru' evicts the oldest one.
+
+    known_accounts lists (account_id, environment, access_token,
+    ctid_account_id) tuples; the first min_connections of them are
+    connected in the background and kept alive with heartbeats, so
+    requests for them never wait on the broker handshake.
+
+    Stats counters are plain int attributes; updates are best-effort and
+    may interleave across awaits.
+    """
+
+    __slots__ = (
+        'connections', 'max_connections', 'idle_timeout', 'eviction_policy',
+        'min_connections', 'known_accounts', 'connections_created',
+        'connections_reused', 'trades_executed', 'errors', 'data_mapper',
+        '_cleanup_task', '_warmer_task', '_prices', '_price_inflight',
+        '_spot_stream_key', '_spot_update', '_mock_positions',
+        '_expiry_heap', '_expiry_added', '_next_generation', '_connect_locks',
+        '_equity_history', '__weakref__'
+    )
+
+    def __init__(self, max_connections: int = 50, idle_timeout: int = 300,
+                 eviction_policy: Literal['lru', 'mru'] = 'mru',
+                 min_connections: int = 0,
+                 known_accounts: Optional[List[Tuple[str, str, str, int]]] = None):
+        # Ordered least- to most-recently used; hits move to the end
+        # Keyed by (account_id, environment)
+        self.connections: OrderedDict[Tuple[str, str], CTraderConnectionWrapper] = OrderedDict()
         self.max_connections = max_connections
         self.idle_timeout = idle_timeout
-        self.stats = defaultdict(int)
+        self.eviction_policy = eviction_policy
+        self.min_connections = min_connections
+        self.known_accounts = known_accounts or []
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.trades_executed = 0
+        self.errors = 0
         self.data_mapper = CTraderDataMapper()
         self._cleanup_task = None
-        self._prices_cache = {}
-        self._mock_positions = {}  # For testing without API
+        self._warmer_task = None
+        self._prices = PriceTable()
+        self._price_inflight: Dict[str, asyncio.Future] = {}
+        self._spot_stream_key = None  # Connection carrying the all-symbol spot subscription
+        self._spot_update = asyncio.Event()
+        # For testing without API: account_id -> position id -> position
+        self._mock_positions: Dict[str, Dict[Any, Dict]] = {}
+        # (deadline, conn_key, generation) min-heap driving idle cleanup
+        self._expiry_heap: List[Tuple[float, Tuple[str, str], int]] = []
+        self._expiry_added = asyncio.Event()
+        self._next_generation = 0
+        self._connect_locks = [asyncio.Lock() for _ in range(CONNECT_SHARDS)]
+        self._equity_history: Dict[str, EquityHistory] = {}  # Sampled by get_risk_status
 
     async def initialize(self):
         """Initialize the connection pool"""
         logger.info("Initializing cTrader connection pool")
         self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
 
+        if self.min_connections and self.known_accounts:
+            self._warmer_task = asyncio.create_task(self._keep_connections_warm())
+
     async def cleanup(self):
         """Cleanup all connections"""
         logger.info("Cleaning up cTrader connection pool")
 
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
+        # Stop background tasks before tearing down the connections they use
+        for task in (self._cleanup_task, self._warmer_task):
+            if task:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
 
-        # Close all connections
-        for conn in list(self.connections.values()):
-            await conn.disconnect()
+        # Close all connections concurrently; a dead socket cannot stall shutdown
+        try:
+            async with asyncio.timeout(CLEANUP_TIMEOUT):
+                async with asyncio.TaskGroup() as tg:
+                    for conn in self.connections.values():
+                        tg.create_task(conn.disconnect())
+        except TimeoutError:
+            logger.warning(f"Timed out closing cTrader connections after {CLEANUP_TIMEOUT}s")
 
         self.connections.clear()
+        self._equity_history.clear()
 
     async def get_connection(self, account_id: str, environment: str = 'demo',
                            access_token: str = None, ctid_account_id: int = None) -> CTraderConnectionWrapper:
         """Get or create a connection for account"""
-        conn_key = f"{account_id}_{environment}"
-
-        # Try to reuse existing connection
-        if conn_key in self.connections:
-            conn = self.connections[conn_key]
-            if conn.is_connected:
-                conn.update_last_used()
-                self.stats['connections_reused'] += 1
-                return conn
-            else:
+        conn_key = (account_id, environment)
+
+        # Fast path: reuse a live connection without taking any lock
+        conn = self.connections.get(conn_key)
+        if conn is not None and conn.is_connected:
+            return self._reuse_connection(conn_key, conn)
+
+        # Only callers for the same shard wait on each other, so a burst of
+        # first requests for one account opens a single broker connection
+        async with self._connect_locks[hash(conn_key) & (CONNECT_SHARDS - 1)]:
+            conn = self.connections.get(conn_key)
+            if conn is not None:
+                if conn.is_connected:
+                    return self._reuse_connection(conn_key, conn)
                 # Remove stale connection
                 del self.connections[conn_key]
 
-        # Check connection limit
-        if len(self.connections) >= self.max_connections:
-            # Remove oldest idle connection
-            await self._remove_oldest_idle_connection()
+            # Create new connection
+            conn = CTraderConnectionWrapper(account_id, environment)
 
-        # Create new connection
-        conn = CTraderConnectionWrapper(account_id, environment)
-
-        if access_token and ctid_account_id:
-            await conn.connect(access_token, ctid_account_id)
-            self.connections[conn_key] = conn
-            self.stats['connections_created'] += 1
-        else:
-            # Mock connection for testing
-            conn.is_connected = True
+            if access_token and ctid_account_id:
+                await conn.connect(access_token, ctid_account_id)
+                self.connections_created += 1
+            else:
+                # Mock connection for testing
+                conn.is_connected = True
+
+            # Check connection limit and make room according to the eviction
+            # policy. Misses in other shards may have filled the pool while
+            # this one connected, and eviction awaits too, so re-check until
+            # the insert fits
+            while self.connections and len(self.connections) >= self.max_connections:
+                await self._evict_connection()
             self.connections[conn_key] = conn
 
+            self._schedule_expiry(conn_key, conn)
+            return conn
+
+    def _reuse_connection(self, conn_key: Tuple[str, str], conn: CTraderConnectionWrapper) -> CTraderConnectionWrapper:
+        """Mark an existing connection as used and return it"""
+        conn.update_last_used()
+        self.connections.move_to_end(conn_key)
+        self.connections_reused += 1
         return conn
 
-    async def _remove_oldest_idle_connection(self):
-        """Remove the oldest idle connection"""
+    def _schedule_expiry(self, conn_key: Tuple[str, str], conn: CTraderConnectionWrapper):
+        """Register a new connection with the idle cleanup heap"""
+        self._next_generation += 1
+        conn.generation = self._next_generation
+        heapq.heappush(self._expiry_heap, (conn.last_used + self.idle_timeout, conn_key, conn.generation))
+        self._expiry_added.set()
+
+    def _forget_account(self, conn_key: Tuple[str, str]):
+        """Drop per-account state once an account has no connection left in the pool"""
+        account_id = conn_key[0]
+        if not any(key[0] == account_id for key in self.connections):
+            self._equity_history.pop(account_id, None)
+
+    async def _evict_connection(self):
+        """Evict one connection according to the eviction policy"""
         if not self.connections:
             return
 
-        oldest_key = None
-        oldest_time = datetime.now()
+        if self.eviction_policy == 'mru':
+            # Walk back from the most recently used end and take the first
+            # connection outside the grace window, so in-flight calls survive
+            idle_threshold = time.monotonic() - EVICTION_GRACE_SECONDS
+            for key in reversed(self.connections):
+                conn = self.connections[key]
+                if conn.last_used < idle_threshold:
+                    del self.connections[key]
+                    self._forget_account(key)
+                    await conn.disconnect()
+                    logger.info(f"Removed idle connection: {key[0]}_{key[1]}")
+                    return
 
-        for key, conn in self.connections.items():
-            if conn.last_used < oldest_time:
-                oldest_time = conn.last_used
-                oldest_key = key
+        await self._remove_oldest_idle_connection()
 
-        if oldest_key:
-            conn = self.connections[oldest_key]
-            await conn.disconnect()
-            del self.connections[oldest_key]
-            logger.info(f"Removed idle connection: {oldest_key}")
+    async def _remove_oldest_idle_connection(self):
+        """Remove the oldest idle connection"""
+        if not self.connections:
+            return
+
+        # Head of the ordered dict is the least recently used connection
+        oldest_key, conn = self.connections.popitem(last=False)
+        self._forget_account(oldest_key)
+        await conn.disconnect()
+        logger.info(f"Removed idle connection: {oldest_key[0]}_{oldest_key[1]}")
 
     async def _periodic_cleanup(self):
-        """Periodically clean up idle connections"""
+        """Close connections when they reach their idle deadline
+
+        Sleeps until the earliest deadline in the heap instead of polling.
+        Entries are only pushed when a connection is created; a popped entry
+        whose connection was used since is pushed back at its new deadline,
+        and one whose key now holds a different wrapper is dropped.
+        """
         while True:
             try:
-                await asyncio.sleep(60)  # Check every minute
-
-                now = datetime.now()
-                idle_threshold = now - timedelta(seconds=self.idle_timeout)
+                if not self._expiry_heap:
+                    await self._expiry_added.wait()
+                    self._expiry_added.clear()
+                    continue
+
+                # New entries always expire after existing ones, so the head
+                # deadline can only move later while we sleep
+                delay = self._expiry_heap[0][0] - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                now = time.monotonic()
+                while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                    _, key, generation = heapq.heappop(self._expiry_heap)
+                    conn = self.connections.get(key)
+                    if conn is None or conn.generation != generation:
+                        continue
+
+                    deadline = conn.last_used + self.idle_timeout
+                    if deadline > now:
+                        heapq.heappush(self._expiry_heap, (deadline, key, generation))
+                        continue
 
-                # Find idle connections
-                idle_connections = []
-                for key, conn in self.connections.items():
-                    if conn.last_used < idle_threshold:
-                        idle_connections.append(key)
-
-                # Remove idle connections
-                for key in idle_connections:
-                    conn = self.connections[key]
-                    await conn.disconnect()
                     del self.connections[key]
-                    logger.info(f"Cleaned up idle connection: {key}")
+                    self._forget_account(key)
+                    await conn.disconnect()
+                    logger.info(f"Cleaned up idle connection: {key[0]}_{key[1]}")
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in periodic cleanup: {e}")
 
-    # ============= ACCOUNT OPERATIONS =============
+    async def _keep_connections_warm(self):
+        """Keep connections to known accounts open ahead of requests"""
+        interval = max(1, self.idle_timeout // 2)
 
-    async def get_account_info(self, account_id: str, environment: str = 'demo') -> Optional[Dict]:
-        """Get account information"""
-        try:
-            conn = await self.get_connection(account_id, environment)
+        while True:
+            try:
+                for account_id, environment, access_token, ctid_account_id in self.known_accounts[:self.min_connections]:
+                    conn = self.connections.get((account_id, environment))
 
-            if not HAS_CTRADER_API:
-                # Return mock data
-                return {
-                    'accountId': account_id,
-                    'balance': 10000.0,
-                    'equity': 10000.0,
-                    'margin': 0.0,
-                    'freeMargin': 10000.0,
-                    'currency': 'USD',
-                    'leverage': 100,
-                    'environment': environment
-                }
+                    try:
+                        if conn and conn.is_connected:
+                            await conn.heartbeat()
+                            # A warm connection must not reach its idle deadline
+                            conn.update_last_used()
+                        else:
+                            await self.get_connection(account_id, environment, access_token, ctid_account_id)
+                    except Exception as e:
+                        logger.error(f"Failed to warm connection for {account_id}: {e}")
 
-            # Check cache
-            if conn.account_info_cache and conn.is_cache_valid(5):
-                return conn.account_info_cache
+                await asyncio.sleep(interval)
 
-            # Get account info
-            account_req = ProtoOAAccountsTokenRes()
-            await conn.client.send(account_req)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in connection warmer: {e}")
 
-            # Update cache
-            conn.account_info_cache = account_info
-            conn.cache_timestamp = datetime.now()
+    # ============= ACCOUNT OPERATIONS =============
 
-            return account_info
-        except Exception as e:
-            logger.error(f"Failed to get account info: {e}")
-            self.stats['errors'] += 1
-            return None
+    @_with_connection('get account info')
+    async def get_account_info(self, conn: CTraderConnectionWrapper) -> Optional[Dict]:
+        """Get account information"""
+        if not HAS_CTRADER_API:
+            # Return mock data
+            return {
+                'accountId': conn.account_id,
+                'balance': 10000.0,
+                'equity': 10000.0,
+                'margin': 0.0,
+                'freeMargin': 10000.0,
+                'currency': 'USD',
+                'leverage': 100,
+                'environment': conn.environment
+            }
 
-    async def get_positions(self, account_id: str, environment: str = 'demo') -> List[Dict]:
-        """Get open positions"""
-        try:
-            conn = await self.get_connection(account_id, environment)
+        # Check cache
+        if conn.account_info_cache and conn.is_cache_valid(5):
+            return conn.account_info_cache
 
-            if not HAS_CTRADER_API:
-                # Return mock positions for testing
-                return self._mock_positions.get(account_id, [])
+        # Get account info
+        account_req = ProtoOAAccountsTokenRes()
+        account_info = await conn.coalesce('account_info', lambda: conn.client.send(account_req))
 
-            # Check cache
-            if conn.positions_cache and conn.is_cache_valid(1):
-                return list(conn.positions_cache.values())
+        # Update cache
+        conn.account_info_cache = account_info
+        conn.cache_timestamp = time.monotonic()
 
-            # Get positions
-            reconcile_req = ProtoOAReconcileReq()
-            reconcile_req.ctidTraderAccountId = conn.ctid_account_id
+        return account_info
 
-            response = await conn.client.send(reconcile_req)
+    @_with_connection('get positions', default=())
+    async def get_positions(self, conn: CTraderConnectionWrapper) -> Sequence[Any]:
+        """Get open positions"""
+        if not HAS_CTRADER_API:
+            # Return mock positions for testing
+            return list(self._mock_positions.get(conn.account_id, {}).values())
 
-            # Update cache
-            conn.positions_cache = {pos.positionId: pos for pos in response.position}
-            conn.cache_timestamp = datetime.now()
+        # Check cache (kept current by execution events)
+        if conn.is_synced(conn.positions_timestamp):
+            return conn.positions()
 
-            return list(conn.positions_cache.values())
-        except Exception as e:
-            logger.error(f"Failed to get positions: {e}")
-            self.stats['errors'] += 1
-            return []
+        # Get positions
+        # Positions and orders share one reconcile round-trip
+        response = await conn.coalesce('reconcile', lambda: conn.client.send(conn.reconcile_req))
 
-    async def get_orders(self, account_id: str, environment: str = 'demo') -> List[Dict]:
-        """Get pending orders"""
-        try:
-            conn = await self.get_connection(account_id, environment)
+        # Update cache
+        conn.apply_reconcile(response)
 
-            if not HAS_CTRADER_API:
-                return []
+        return conn.positions()
 
-            # Check cache
-            if conn.orders_cache and conn.is_cache_valid(1):
-                return list(conn.orders_cache.values())
+    @_with_connection('get orders', default=())
+    async def get_orders(self, conn: CTraderConnectionWrapper) -> Sequence[Any]:
+        """Get pending orders"""
+        if not HAS_CTRADER_API:
+            return []
 
-            # Get orders
-            reconcile_req = ProtoOAReconcileReq()
-            reconcile_req.ctidTraderAccountId = conn.ctid_account_id
+        # Check cache (kept current by execution events)
+        if conn.is_synced(conn.orders_timestamp):
+            return conn.orders()
 
-            response = await conn.client.send(reconcile_req)
+        # Get orders
+        # Positions and orders share one reconcile round-trip
+        response = await conn.coalesce('reconcile', lambda: conn.client.send(conn.reconcile_req))
 
-            # Update cache
-            conn.orders_cache = {order.orderId: order for order in response.order}
-            conn.cache_timestamp = datetime.now()
+        # Update cache
+        conn.apply_reconcile(response)
 
-            return list(conn.orders_cache.values())
-        except Exception as e:
-            logger.error(f"Failed to get orders: {e}")
-            self.stats['errors'] += 1
-            return []
+        return conn.orders()
 
     # ============= TRADING OPERATIONS =============
 
-    async def execute_trade(self, account_id: str, environment: str, trade_data: Dict) -> Dict:
+    @_with_connection('execute trade', default=lambda e: {'success': False, 'error': str(e)})
+    async def execute_trade(self, conn: CTraderConnectionWrapper, trade_data: Dict) -> Dict:
         """Execute a market order"""
-        try:
-            conn = await self.get_connection(account_id, environment)
-
-            if not HAS_CTRADER_API:
-                # Mock trade execution
-                self.stats['trades_executed'] += 1
-                return {
-                    'success': True,
-                    'orderId': f"mock_{datetime.now().timestamp()}",
-                    'executedVolume': trade_data.get('volume', 0),
-                    'executedPrice': 1.1000
-                }
+        if not HAS_CTRADER_API:
+            # Mock trade execution
+            self.trades_executed += 1
+            return {
+                'success': True,
+                'orderId': f"mock_{datetime.now().timestamp()}",
+                'executedVolume': trade_data.get('volume', 0),
+                'executedPrice': 1.1000
+            }
 
-            # Map trade data to cTrader format
-            order = self.data_mapper.map_order_request(trade_data)
+        # Map trade data to cTrader format
+        order = self.data_mapper.map_order_request(trade_data)
 
-            # Send order
-            order_req = ProtoOANewOrderReq()
-            order_req.ctidTraderAccountId = conn.ctid_account_id
-            order_req.symbolId = order['symbolId']
-            order_req.orderType = order['orderType']
-            order_req.tradeSide = order['tradeSide']
-            order_req.volume = order['volume']
+        # Send order
+        order_req = ProtoOANewOrderReq()
+        order_req.ctidTraderAccountId = conn.ctid_account_id
+        order_req.symbolId = order['symbolId']
+        order_req.orderType = order['orderType']
+        order_req.tradeSide = order['tradeSide']
+        order_req.volume = order['volume']
 
-            if 'stopLoss' in order:
-                order_req.stopLoss = order['stopLoss']
-            if 'takeProfit' in order:
-                order_req.takeProfit = order['takeProfit']
-            if 'comment' in order:
-                order_req.comment = order['comment']
+        if 'stopLoss' in order:
+            order_req.stopLoss = order['stopLoss']
+        if 'takeProfit' in order:
+            order_req.takeProfit = order['takeProfit']
+        if 'comment' in order:
+            order_req.comment = order['comment']
 
-            response = await conn.client.send(order_req)
+        response = await conn.client.send(order_req)
 
-            self.stats['trades_executed'] += 1
+        self.trades_executed += 1
 
-            return {
-                'success': True,
-                'orderId': str(response.executionEvent.orderId),
-                'positionId': str(response.executionEvent.position.positionId) if response.executionEvent.position else None,
-                'executedVolume': response.executionEvent.executedVolume / 100,
-                'executedPrice': response.executionEvent.executionPrice
-            }
-        except Exception as e:
-            logger.error(f"Failed to execute trade: {e}")
-            self.stats['errors'] += 1
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return {
+            'success': True,
+            'orderId': str(response.executionEvent.orderId),
+            'positionId': str(response.executionEvent.position.positionId) if response.executionEvent.position else None,
+            'executedVolume': response.executionEvent.executedVolume / 100,
+            'executedPrice': response.executionEvent.executionPrice
+        }
 
-    async def modify_position(self, account_id: str, environment: str,
-                            position_id: str, stop_loss: float = None, take_profit: float = None) -> bool:
+    @_with_connection('modify position', default=False)
+    async def modify_position(self, conn: CTraderConnectionWrapper, position_id: str,
+                            stop_loss: float = None, take_profit: float = None) -> bool:
         """Modify position SL/TP"""
-        try:
-            conn = await self.get_connection(account_id, environment)
-
-            if not HAS_CTRADER_API:
-                return True
+        if not HAS_CTRADER_API:
+            return True
 
-            # Send modification request
-            amend_req = ProtoOAAmendPositionSLTPReq()
-            amend_req.ctidTraderAccountId = conn.ctid_account_id
-            amend_req.positionId = int(position_id)
+        # Send modification request
+        amend_req = ProtoOAAmendPositionSLTPReq()
+        amend_req.ctidTraderAccountId = conn.ctid_account_id
+        amend_req.positionId = int(position_id)
 
-            if stop_loss is not None:
-                amend_req.stopLoss = stop_loss
-            if take_profit is not None:
-                amend_req.takeProfit = take_profit
+        if stop_loss is not None:
+            amend_req.stopLoss = stop_loss
+        if take_profit is not None:
+            amend_req.takeProfit = take_profit
 
-            await conn.client.send(amend_req)
+        await conn.client.send(amend_req)
 
-            return True
-        except Exception as e:
-            logger.error(f"Failed to modify position: {e}")
-            self.stats['errors'] += 1
-            return False
+        return True
 
-    async def close_position(self, account_id: str, environment: str, position_id: str) -> bool:
+    @_with_connection('close position', default=False)
+    async def close_position(self, conn: CTraderConnectionWrapper, position_id: str) -> bool:
         """Close a position"""
-        try:
-            conn = await self.get_connection(account_id, environment)
+        if not HAS_CTRADER_API:
+            # Remove from mock positions
+            self._mock_positions.get(conn.account_id, {}).pop(position_id, None)
+            return True
 
-            if not HAS_CTRADER_API:
-                # Remove from mock positions
-                if account_id in self._mock_positions:
-                    self._mock_positions[account_id] = [
-                        p for p in self._mock_positions[account_id]
-                        if p.get('id') != position_id
-                    ]
-                return True
+        # Send close request
+        close_req = ProtoOAClosePositionReq()
+        close_req.ctidTraderAccountId = conn.ctid_account_id
+        close_req.positionId = int(position_id)
 
-            # Send close request
-            close_req = ProtoOAClosePositionReq()
-            close_req.ctidTraderAccountId = conn.ctid_account_id
-            close_req.positionId = int(position_id)
+        await conn.client.send(close_req)
 
-            await conn.client.send(close_req)
+        # Remove from cache (keyed by the numeric cTrader position id)
+        if conn.positions_cache is not None:
+            conn.positions_cache.pop(int(position_id), None)
+            conn.positions_snapshot = None
 
-            # Remove from cache
-            if position_id in conn.positions_cache:
-                del conn.positions_cache[position_id]
-
-            return True
-        except Exception as e:
-            logger.error(f"Failed to close position: {e}")
-            self.stats['errors'] += 1
-            return False
+        return True
 
     # ============= STREAMING OPERATIONS =============
 
@@ -465,10 +717,10 @@ class CTraderConnectionPool:
     async def get_price(self, symbol: str) -> Optional[Dict]:
         """Get current price for symbol"""
         try:
-            # Check cache
-            cached = self._prices_cache.get(symbol)
-            if cached and (datetime.now() - cached['timestamp']).total_seconds() < 1:
-                return cached['data']
+            # Check cache; streamed prices are pushed on every tick, so they never go stale
+            cached = self._prices.get(symbol, None if self._spot_stream_active() else 1)
+            if cached:
+                return self._price_envelope(symbol, *cached)
 
             symbol_info = self.data_mapper.get_symbol_mapping(symbol)
             if not symbol_info:
@@ -476,87 +728,168 @@ class CTraderConnectionPool:
 
             if not HAS_CTRADER_API:
                 # Return mock price
-                mock_price = {
-                    'symbol': symbol,
-                    'bid': 1.1000,
-                    'ask': 1.1002,
-                    'brokerTime': datetime.now().isoformat()
-                }
-                self._prices_cache[symbol] = {
-                    'data': mock_price,
-                    'timestamp': datetime.now()
-                }
-                return mock_price
-
-            # Get price from any active connection
-            for conn in self.connections.values():
-                if conn.is_connected:
-                    # Send spot request
-                    spot_req = ProtoOASpotEvent()
-                    response = await conn.client.send(spot_req)
-
-                    # Find our symbol in response
-                    for spot in response.spots:
-                        if spot.symbolId == symbol_info['cTraderId']:
-                            price_data = self.data_mapper.map_price_data(
-                                spot.symbolId,
-                                spot.bid,
-                                spot.ask
-                            )
-
-                            # Cache price
-                            self._prices_cache[symbol] = {
-                                'data': price_data,
-                                'timestamp': datetime.now()
-                            }
-
-                            return price_data
-
-            return None
+                self._prices.update(symbol, 1.1000, 1.1002)
+                return self._price_envelope(symbol, *self._prices.get(symbol))
+
+            # Concurrent requests for the same symbol share one spot request
+            return await single_flight(
+                self._price_inflight, symbol,
+                lambda: self._fetch_price(symbol, symbol_info)
+            )
         except Exception as e:
             logger.error(f"Failed to get price: {e}")
             return None
 
+    async def _fetch_price(self, symbol: str, symbol_info: Dict) -> Optional[Dict]:
+        """Request a spot price for symbol from any active connection"""
+        for conn in list(self.connections.values()):
+            if conn.is_connected:
+                # Send spot request
+                spot_req = ProtoOASpotEvent()
+                response = await conn.client.send(spot_req)
+
+                # Find our symbol in response
+                for spot in response.spots:
+                    if spot.symbolId == symbol_info['cTraderId']:
+                        # Cache price
+                        self._prices.update(symbol, spot.bid, spot.ask)
+
+                        return self._price_envelope(symbol, *self._prices.get(symbol))
+
+        return None
+
     async def get_all_prices(self) -> Dict[str, Any]:
         """Get all current prices"""
-        prices = {}
+        symbols = self.data_mapper.symbols
 
-        # Get prices for all known symbols
-        for symbol in self.data_mapper.get_all_symbols():
-            price = await self.get_price(symbol)
-            if price:
-                prices[symbol] = price
+        if not HAS_CTRADER_API:
+            prices = {}
+            for symbol in symbols:
+                price = await self.get_price(symbol)
+                if price:
+                    prices[symbol] = price
+            return prices
 
-        return prices
+        try:
+            subscribed = await self._ensure_spot_stream(symbols)
+        except Exception as e:
+            logger.error(f"Failed to subscribe to spot prices: {e}")
+            subscribed = False
+
+        # Give a fresh subscription a moment to deliver the first tick per symbol;
+        # an established stream is served as-is
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SPOT_SNAPSHOT_TIMEOUT
+        # The table only ever holds mapped symbols, so its size tracks coverage
+        while subscribed and len(self._prices) < len(symbols):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self._spot_update.clear()
+            try:
+                await asyncio.wait_for(self._spot_update.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        # Without a live stream, stored quotes expire like get_price's cached ones
+        max_age = None if self._spot_stream_active() else 1
+        return {
+            symbol: self._price_envelope(symbol, *quote)
+            for symbol, quote in self._prices.snapshot(max_age).items()
+        }
+
+    def _spot_stream_active(self) -> bool:
+        """Check if the all-symbol spot subscription is still live"""
+        if not self._spot_stream_key:
+            return False
+        conn = self.connections.get(self._spot_stream_key)
+        return bool(conn and conn.is_connected)
+
+    async def _ensure_spot_stream(self, symbols: Tuple[str, ...]) -> bool:
+        """Subscribe to spots for all symbols with one request on one connection
+
+        Returns True only when a new subscription was just sent.
+        """
+        if self._spot_stream_active():
+            return False
+
+        conn = next((c for c in self.connections.values() if c.is_connected), None)
+        if not conn:
+            return False
+
+        conn.on_spot = self._on_spot
+
+        sub_req = ProtoOASubscribeSpotsReq()
+        sub_req.ctidTraderAccountId = conn.ctid_account_id
+        symbol_ids = self.data_mapper.symbol_ids
+        sub_req.symbolId.extend(symbol_ids[symbol] for symbol in symbols)
+        await conn.client.send(sub_req)
+
+        self._spot_stream_key = (conn.account_id, conn.environment)
+        return True
+
+    def _on_spot(self, symbol_id: int, bid: Optional[float], ask: Optional[float]):
+        """Store a pushed spot tick in the price table, keeping any side not sent"""
+        symbol_info = self.data_mapper.reverse_symbol_mapping.get(symbol_id)
+        if not symbol_info:
+            return
+
+        self._prices.update(symbol_info.mt5_symbol, bid, ask)
+        self._spot_update.set()
+
+    def _price_envelope(self, symbol: str, bid: float, ask: float, wall_time: float) -> Dict:
+        """Build the MetaAPI price dict for a stored quote"""
+        return self.data_mapper.map_price_data(self.data_mapper.symbol_ids[symbol], bid, ask, wall_time)
 
     # ============= POOL MANAGEMENT =============
 
     def get_stats(self) -> Dict[str, int]:
         """Get pool statistics"""
         return {
-            'connectionsCreated': self.stats['connections_created'],
-            'connectionsReused': self.stats['connections_reused'],
-            'tradesExecuted': self.stats['trades_executed'],
-            'errors': self.stats['errors'],
+            'connectionsCreated': self.connections_created,
+            'connectionsReused': self.connections_reused,
+            'tradesExecuted': self.trades_executed,
+            'errors': self.errors,
             'activeConnections': len(self.connections),
-            'reuse_ratio': self.stats['connections_reused'] / max(1, self.stats['connections_created'])
+            'reuse_ratio': self.connections_reused / max(1, self.connections_created)
         }
 
     async def get_accounts_summary(self) -> Dict[str, Any]:
         """Get summary of all accounts"""
         summary = {}
 
-        for conn_key, conn in self.connections.items():
-            if conn.is_connected:
-                account_info = await self.get_account_info(conn.account_id, conn.environment)
-                if account_info:
-                    summary[conn.account_id] = {
-                        'balance': account_info.get('balance', 0),
-                        'equity': account_info.get('equity', 0),
-                        'openPositions': len(conn.positions_cache),
-                        'environment': conn.environment,
-                        'lastActivity': conn.last_used.isoformat()
-                    }
+        # Snapshot first: fetching account info may add or evict connections
+        connected = [conn for conn in self.connections.values() if conn.is_connected]
+        semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+
+        async def _fetch(conn):
+            async with semaphore:
+                return await asyncio.wait_for(
+                    self.get_account_info(conn.account_id, conn.environment),
+                    SUMMARY_ACCOUNT_TIMEOUT
+                )
+
+        results = await asyncio.gather(*[_fetch(conn) for conn in connected], return_exceptions=True)
+
+        # last_used is monotonic; anchor it to one wall-clock reading
+        now_wall = datetime.now()
+        now_mono = time.monotonic()
+
+        for conn, account_info in zip(connected, results):
+            if isinstance(account_info, asyncio.TimeoutError):
+                logger.warning(f"Timed out summarizing account {conn.account_id}")
+                continue
+            if isinstance(account_info, Exception):
+                logger.error(f"Failed to summarize account {conn.account_id}: {account_info}")
+                continue
+            if account_info:
+                summary[conn.account_id] = {
+                    'balance': account_info.get('balance', 0),
+                    'equity': account_info.get('equity', 0),
+                    'openPositions': len(conn.positions_cache or ()),
+                    'environment': conn.environment,
+                    'lastActivity': (now_wall - timedelta(seconds=now_mono - conn.last_used)).isoformat()
+                }
 
         return summary
 
@@ -601,9 +934,14 @@ class CTraderConnectionPool:
             if balance > 0:
                 drawdown = ((balance - equity) / balance) * 100
 
+            history = self._equity_history.get(account_id)
+            if history is None:
+                history = self._equity_history[account_id] = EquityHistory()
+            history.append(equity)
+
             return {
                 'drawdown': drawdown,
-                'maxDrawdown': drawdown,  # Would need historical tracking
+                'maxDrawdown': max(drawdown, history.max_drawdown()),
                 'riskLevel': 'low' if drawdown < 5 else 'medium' if drawdown < 10 else 'high',
                 'marginLevel': account_info.get('marginLevel', 0)
             }
@@ -623,22 +961,27 @@ class CTraderConnectionPool:
 
     def add_mock_position(self, account_id: str, position: Dict):
         """Add mock position for testing"""
-        if account_id not in self._mock_positions:
-            self._mock_positions[account_id] = []
-        self._mock_positions[account_id].append(position)
+        self._mock_positions.setdefault(account_id, {})[position.get('id')] = position
 
     def clear_mock_positions(self, account_id: str):
         """Clear mock positions"""
         if account_id in self._mock_positions:
-            self._mock_positions[account_id] = []
+            self._mock_positions[account_id].clear()
 
 
-# Global pool instance
-_pool_instance = None
+# Global pool instance; weakly held so the pool is freed once its owner
+# (e.g. the API lifespan) drops it
+_pool_ref: Optional[weakref.ref] = None
 
 def get_pool() -> CTraderConnectionPool:
-    """Get singleton pool instance"""
-    global _pool_instance
-    if _pool_instance is None:
-        _pool_instance = CTraderConnectionPool()
-    return _pool_instance
\ No newline at end of file
+    """Get singleton pool instance
+
+    Callers must keep the returned pool referenced for as long as they use
+    it; otherwise the next call may build a fresh one.
+    """
+    global _pool_ref
+    pool = _pool_ref() if _pool_ref is not None else None
+    if pool is None:
+        pool = CTraderConnectionPool()
+        _pool_ref = weakref.ref(pool)
+    return pool
\ No newline at end of file
@@ -4,42 +4,322 @@ cTrader Data Mapper (Python version)
 Converts between cTrader and MetaAPI formats
 """
 
+import functools
 import json
+import operator
 import os
-from typing import Dict, Optional, Any, List
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, Optional, Any, List, Mapping, NamedTuple, Tuple
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Batches at least this long are extracted column-wise and scaled with numpy
+COLUMNAR_BATCH_THRESHOLD = 256
+
+SYMBOLS_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    'config',
+    'symbols.json'
+)
+
+class SymbolInfo(NamedTuple):
+    """Flat per-symbol record, indexed by cTrader symbol id"""
+    mt5_symbol: Optional[str]
+    ctrader_id: int
+    ctrader_symbol: Optional[str] = None
+    multiplier: float = 1
+    digits: int = 5
+    tick_value: float = 1
+
+# Stand-in for symbol ids missing from the config
+_UNKNOWN_SYMBOL = SymbolInfo(mt5_symbol=None, ctrader_id=-1)
+
+# Symbol ids below this are served from a list indexed by id; any higher
+# ids fall back to the reverse mapping dict
+SYMBOL_TABLE_MAX_ID = 1 << 16
+
+@functools.lru_cache(maxsize=1)
+def _load_symbol_mapping() -> Tuple[Mapping[str, Dict], Mapping[int, SymbolInfo], Tuple[str, ...],
+                                    Mapping[str, int], Tuple[SymbolInfo, ...]]:
+    """Parse symbols.json once per process into read-only lookup tables
+
+    Returns (symbol_mapping, reverse_symbol_mapping, symbols, symbol_ids,
+    symbol_table).
+    """
+    try:
+        with open(SYMBOLS_CONFIG_PATH, 'rb') as f:
+            config = _json_loads(f.read())
+        symbol_mapping = config.get('symbolMapping', {})
+    except Exception as e:
+        print(f"Failed to load symbol mapping: {e}")
+        symbol_mapping = {}
+
+    # Create reverse mapping
+    reverse_symbol_mapping = {
+        mapping['cTraderId']: SymbolInfo(
+            mt5_symbol=mt5_symbol,
+            ctrader_id=mapping['cTraderId'],
+            ctrader_symbol=mapping.get('cTraderSymbol'),
+            multiplier=mapping.get('multiplier', 1),
+            digits=mapping.get('digits', 5),
+            tick_value=mapping.get('tickValue', 1)
+        )
+        for mt5_symbol, mapping in symbol_mapping.items()
+    }
+    symbol_ids = {
+        mt5_symbol: mapping['cTraderId']
+        for mt5_symbol, mapping in symbol_mapping.items()
+    }
+
+    return (
+        MappingProxyType(symbol_mapping),
+        MappingProxyType(reverse_symbol_mapping),
+        tuple(symbol_mapping),
+        MappingProxyType(symbol_ids),
+        _build_symbol_table(reverse_symbol_mapping)
+    )
+
+def _build_symbol_table(reverse_symbol_mapping: Dict[int, SymbolInfo]) -> Tuple[SymbolInfo, ...]:
+    """Dense tuple indexed by cTrader symbol id, _UNKNOWN_SYMBOL in the gaps"""
+    ids = [symbol_id for symbol_id in reverse_symbol_mapping if 0 <= symbol_id < SYMBOL_TABLE_MAX_ID]
+    table = [_UNKNOWN_SYMBOL] * (max(ids) + 1 if ids else 0)
+    for symbol_id in ids:
+        table[symbol_id] = reverse_symbol_mapping[symbol_id]
+    return tuple(table)
+
+# MetaAPI order type -> cTrader order type
+_ORDER_TYPE_MAP_MTA_TO_CT = MappingProxyType({
+    'ORDER_TYPE_BUY': 1,         # MARKET
+    'ORDER_TYPE_SELL': 1,        # MARKET
+    'ORDER_TYPE_BUY_LIMIT': 2,   # LIMIT
+    'ORDER_TYPE_SELL_LIMIT': 2,  # LIMIT
+    'ORDER_TYPE_BUY_STOP': 3,    # STOP
+    'ORDER_TYPE_SELL_STOP': 3    # STOP
+})
+
+# cTrader order type -> request field carrying the order's open price
+_PRICE_FIELD_BY_CT_TYPE = MappingProxyType({
+    2: 'limitPrice',  # LIMIT
+    3: 'stopPrice'    # STOP
+})
+
+def _parse_action_type(action_type: str) -> Tuple[int, str, Optional[str]]:
+    """(cTrader order type, trade side, price field) for a MetaAPI order type"""
+    ct_type = _ORDER_TYPE_MAP_MTA_TO_CT.get(action_type, 1)
+    trade_side = 'BUY' if 'BUY' in action_type else 'SELL'
+    if 'LIMIT' in action_type:
+        price_field = 'limitPrice'
+    elif 'STOP' in action_type:
+        price_field = 'stopPrice'
+    else:
+        price_field = None
+    return ct_type, trade_side, price_field
+
+# MetaAPI order type -> (cTrader order type, trade side, price field);
+# anything else is resolved by _parse_action_type
+_ACTION_TO_CT = MappingProxyType({
+    action_type: (ct_type, 'BUY' if 'BUY' in action_type else 'SELL',
+                  _PRICE_FIELD_BY_CT_TYPE.get(ct_type))
+    for action_type, ct_type in _ORDER_TYPE_MAP_MTA_TO_CT.items()
+})
+
+# cTrader order type -> MetaAPI order type (buy side)
+_ORDER_TYPE_MAP_CT_TO_MTA = MappingProxyType({
+    1: 'ORDER_TYPE_BUY',      # MARKET
+    2: 'ORDER_TYPE_BUY_LIMIT', # LIMIT
+    3: 'ORDER_TYPE_BUY_STOP',  # STOP
+    4: 'ORDER_TYPE_SELL',      # For SL/TP
+    5: 'ORDER_TYPE_BUY',       # MARKET_RANGE
+    6: 'ORDER_TYPE_BUY_STOP'   # STOP_LIMIT
+})
+
+# (cTrader order type, trade side) -> final MetaAPI order type
+_ORDER_TYPE_BY_SIDE = MappingProxyType({
+    **{(ct_type, 'BUY'): order_type for ct_type, order_type in _ORDER_TYPE_MAP_CT_TO_MTA.items()},
+    **{(ct_type, 'SELL'): order_type.replace('BUY', 'SELL')
+       for ct_type, order_type in _ORDER_TYPE_MAP_CT_TO_MTA.items()}
+})
+
+# cTrader order status -> MetaAPI order state
+_STATE_MAP = MappingProxyType({
+    'PENDING': 'ORDER_STATE_PLACED',
+    'ACCEPTED': 'ORDER_STATE_PLACED',
+    'FILLED': 'ORDER_STATE_FILLED',
+    'CANCELLED': 'ORDER_STATE_CANCELED',
+    'EXPIRED': 'ORDER_STATE_EXPIRED',
+    'REJECTED': 'ORDER_STATE_REJECTED'
+})
+
+def _as_int(value: Any) -> int:
+    """int(value or 0) without the int() call when value is already an int"""
+    return value if value.__class__ is int else int(value) if value else 0
+
+# Current local time as ISO, reused for up to NOW_ISO_TTL seconds so a burst
+# of records formats "now" once
+NOW_ISO_TTL = 0.001
+_now_iso = ''
+_now_iso_expires = 0.0
+
+def _cached_now_iso() -> str:
+    """datetime.now().isoformat(), refreshed at most once per NOW_ISO_TTL"""
+    global _now_iso, _now_iso_expires
+    t = time.monotonic()
+    if t >= _now_iso_expires:
+        _now_iso = datetime.now().isoformat()
+        _now_iso_expires = t + NOW_ISO_TTL
+    return _now_iso
+
+@functools.lru_cache(maxsize=4096)
+def _second_iso(seconds: int) -> str:
+    """Local ISO time for a whole epoch second"""
+    return datetime.fromtimestamp(seconds).isoformat()
+
+def _ts_iso(ms: Any) -> str:
+    """Local ISO time for an epoch-milliseconds timestamp
+
+    Same result as datetime.fromtimestamp(ms / 1000).isoformat(), but the
+    per-second part is cached since records are re-mapped on every poll.
+    """
+    if type(ms) is not int:
+        return datetime.fromtimestamp(ms / 1000).isoformat()
+    seconds, millis = divmod(ms, 1000)
+    base = _second_iso(seconds)
+    return f"{base}.{millis:03d}000" if millis else base
+
+def _ts_iso_or_now(ms: Any, now_iso: Optional[str] = None) -> str:
+    """_ts_iso(ms), or now_iso (default: the cached current time) when ms is None"""
+    if ms is None:
+        return now_iso or _cached_now_iso()
+    return _ts_iso(ms)
+
+# One C-level call fetches every field of a cTrader record. Protobuf messages
+# always expose all their fields; objects missing any fall back to getattr()
+# with per-field defaults.
+_POSITION_FIELDS = (
+    'symbolId', 'volume', 'tradeSide', 'entryPrice', 'currentPrice', 'positionId',
+    'label', 'swap', 'profit', 'commission', 'comment', 'stopLoss', 'takeProfit',
+    'utcLastUpdateTimestamp', 'utcTimestamp', 'realizedProfit', 'unrealizedProfit'
+)
+_ORDER_FIELDS = (
+    'symbolId', 'volume', 'orderType', 'tradeSide', 'orderId', 'orderStatus', 'label',
+    'limitPrice', 'stopPrice', 'executionPrice', 'comment',
+    'utcLastUpdateTimestamp', 'utcTimestamp'
+)
+_EXECUTION_FIELDS = (
+    'symbolId', 'executionId', 'tradeSide', 'label', 'orderId', 'positionId', 'volume',
+    'executionPrice', 'commission', 'swap', 'profit', 'utcTimestamp', 'comment'
+)
+_get_position_fields = operator.attrgetter(*_POSITION_FIELDS)
+_get_order_fields = operator.attrgetter(*_ORDER_FIELDS)
+_get_execution_fields = operator.attrgetter(*_EXECUTION_FIELDS)
+
+def _getattr_position_fields(pos: Any) -> Tuple:
+    """_POSITION_FIELDS via getattr defaults; missing timestamps become None"""
+    entry_price = getattr(pos, 'entryPrice', 0)
+    profit = getattr(pos, 'profit', 0)
+    return (
+        pos.symbolId, getattr(pos, 'volume', 0), getattr(pos, 'tradeSide', 'BUY'),
+        entry_price, getattr(pos, 'currentPrice', entry_price), getattr(pos, 'positionId', ''),
+        getattr(pos, 'label', 0), getattr(pos, 'swap', 0), profit,
+        getattr(pos, 'commission', 0), getattr(pos, 'comment', ''),
+        getattr(pos, 'stopLoss', 0), getattr(pos, 'takeProfit', 0),
+        getattr(pos, 'utcLastUpdateTimestamp', None), getattr(pos, 'utcTimestamp', None),
+        getattr(pos, 'realizedProfit', 0), getattr(pos, 'unrealizedProfit', profit)
+    )
+
+def _getattr_order_fields(order: Any) -> Tuple:
+    """_ORDER_FIELDS via getattr defaults; missing timestamps become None"""
+    return (
+        order.symbolId, getattr(order, 'volume', 0), getattr(order, 'orderType', 1),
+        getattr(order, 'tradeSide', 'BUY'), getattr(order, 'orderId', ''),
+        getattr(order, 'orderStatus', 'PENDING'), getattr(order, 'label', ''),
+        getattr(order, 'limitPrice', 0), getattr(order, 'stopPrice', 0),
+        getattr(order, 'executionPrice', 0), getattr(order, 'comment', ''),
+        getattr(order, 'utcLastUpdateTimestamp', None), getattr(order, 'utcTimestamp', None)
+    )
+
+def _getattr_execution_fields(event: Any) -> Tuple:
+    """_EXECUTION_FIELDS via getattr defaults; a missing timestamp becomes None"""
+    return (
+        event.symbolId, getattr(event, 'executionId', ''), getattr(event, 'tradeSide', 'BUY'),
+        getattr(event, 'label', ''), getattr(event, 'orderId', ''),
+        getattr(event, 'positionId', ''), getattr(event, 'volume', 0),
+        getattr(event, 'executionPrice', 0), getattr(event, 'commission', 0),
+        getattr(event, 'swap', 0), getattr(event, 'profit', 0),
+        getattr(event, 'utcTimestamp', None), getattr(event, 'comment', '')
+    )
+
+def _position_mapper(mt5_symbol: str, tick_value: float) -> Callable[..., Dict]:
+    """Position mapper with one symbol's constants bound in
+
+    Takes a _POSITION_FIELDS tuple, the fallback now_iso and optionally the
+    volume already converted to lots, so mapping a record on a known symbol
+    needs no symbol lookups at all. This is the single definition of the
+    position wire format.
+    """
+    def map_fields(fields: Tuple, now_iso: Optional[str], lots: Optional[float] = None) -> Dict:
+        (_, volume, trade_side, entry_price, current_price, position_id,
+         label, swap, profit, commission, comment, stop_loss, take_profit,
+         update_ts, open_ts, realized_profit, unrealized_profit) = fields
+
+        return {
+            'id': str(position_id),
+            'type': 'POSITION_TYPE_BUY' if trade_side == 'BUY' else 'POSITION_TYPE_SELL',
+            'symbol': mt5_symbol,
+            'magic': _as_int(label),
+            'openPrice': entry_price,
+            'currentPrice': current_price,
+            'currentTickValue': tick_value,
+            'volume': volume / 100 if lots is None else lots,  # cTrader uses volume * 100
+            'swap': swap,
+            'profit': profit,
+            'commission': commission,
+            'clientId': comment,
+            'stopLoss': stop_loss,
+            'takeProfit': take_profit,
+            'comment': comment,
+            'updateTime': _ts_iso_or_now(update_ts, now_iso),
+            'openTime': _ts_iso_or_now(open_ts, now_iso),
+            'realizedProfit': realized_profit,
+            'unrealizedProfit': unrealized_profit
+        }
+
+    return map_fields
+
 class CTraderDataMapper:
-    """Data mapper for cTrader to MetaAPI format conversion"""
+    """Data mapper for cTrader to MetaAPI format conversion
+
+    Symbol tables are parsed once per process and shared, read-only, by
+    every instance; call reload() to pick up edits to symbols.json.
+    """
+
+    __slots__ = (
+        'symbol_mapping', 'reverse_symbol_mapping', 'symbols', 'symbol_ids',
+        'symbol_table', 'position_mappers'
+    )
 
     def __init__(self):
-        self.symbol_mapping = {}
-        self.reverse_symbol_mapping = {}
         self.load_symbol_mapping()
 
     def load_symbol_mapping(self):
-        """Load symbol mapping from JSON config"""
-        try:
-            config_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                'config',
-                'symbols.json'
-            )
-
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                self.symbol_mapping = config.get('symbolMapping', {})
-
-                # Create reverse mapping
-                for mt5_symbol, mapping in self.symbol_mapping.items():
-                    self.reverse_symbol_mapping[mapping['cTraderId']] = {
-                        **mapping,
-                        'mt5Symbol': mt5_symbol
-                    }
-        except Exception as e:
-            print(f"Failed to load symbol mapping: {e}")
-            self.symbol_mapping = {}
-            self.reverse_symbol_mapping = {}
+        """Attach the shared symbol tables loaded from the JSON config"""
+        (self.symbol_mapping, self.reverse_symbol_mapping,
+         self.symbols, self.symbol_ids, self.symbol_table) = _load_symbol_mapping()
+        # Per-symbol position mappers, built on first use
+        self.position_mappers: Dict[int, Callable[..., Dict]] = {}
+
+    def reload(self):
+        """Re-read symbols.json and attach the fresh tables"""
+        _load_symbol_mapping.cache_clear()
+        self.load_symbol_mapping()
 
     def get_symbol_mapping(self, mt5_symbol: str) -> Optional[Dict]:
         """Get cTrader mapping for MT5 symbol"""
@@ -47,48 +327,76 @@ class CTraderDataMapper:
 
     def get_all_symbols(self) -> List[str]:
         """Get all available MT5 symbols"""
-        return list(self.symbol_mapping.keys())
+        return list(self.symbols)
+
+    def _symbol_info(self, symbol_id: int) -> SymbolInfo:
+        """Look up a cTrader symbol id, _UNKNOWN_SYMBOL if it isn't configured"""
+        table = self.symbol_table
+        if symbol_id.__class__ is int and 0 <= symbol_id < len(table):
+            return table[symbol_id]
+        return self.reverse_symbol_mapping.get(symbol_id, _UNKNOWN_SYMBOL)
 
     def map_position(self, ctrader_position: Any) -> Dict:
         """Convert cTrader position to MetaAPI format"""
-        symbol_info = self.reverse_symbol_mapping.get(ctrader_position.symbolId, {})
-        mt5_symbol = symbol_info.get('mt5Symbol', f'UNKNOWN_{ctrader_position.symbolId}')
-
-        # cTrader uses volume * 100
-        volume = getattr(ctrader_position, 'volume', 0) / 100
-
-        # Determine position type
-        is_buy = getattr(ctrader_position, 'tradeSide', 'BUY') == 'BUY'
+        return self._map_position(ctrader_position, None)
+
+    def map_positions(self, ctrader_positions: List[Any]) -> List[Dict]:
+        """Convert a batch of cTrader positions to MetaAPI format"""
+        # Resolve the fallback timestamp once for the whole batch
+        now_iso = _cached_now_iso()
+
+        if len(ctrader_positions) >= COLUMNAR_BATCH_THRESHOLD:
+            try:
+                rows = [_get_position_fields(pos) for pos in ctrader_positions]
+            except AttributeError:
+                rows = None
+
+            if rows is not None:
+                return self._map_position_rows(rows, now_iso)
+
+        map_one = self._map_position
+        return [map_one(pos, now_iso) for pos in ctrader_positions]
+
+    def _map_position_rows(self, rows: List[Tuple], now_iso: str) -> List[Dict]:
+        """Convert _POSITION_FIELDS rows column-wise
+
+        Volumes are scaled in one numpy pass and the position mapper is resolved
+        once per distinct symbol, so the per-row loop only assembles dicts.
+        """
+        columns = list(zip(*rows))
+        lots = (np.asarray(columns[1], dtype=np.float64) / 100).tolist()  # cTrader uses volume * 100
+
+        position_mappers = self.position_mappers
+        mappers = {
+            symbol_id: position_mappers.get(symbol_id) or self._position_mapper_for(symbol_id)
+            for symbol_id in set(columns[0])
+        }
+        return [mappers[row[0]](row, now_iso, volume) for row, volume in zip(rows, lots)]
 
-        # Get prices
-        entry_price = getattr(ctrader_position, 'entryPrice', 0)
-        current_price = getattr(ctrader_position, 'currentPrice', entry_price)
+    def _map_position(self, ctrader_position: Any, now_iso: Optional[str]) -> Dict:
+        """Convert a single cTrader position, reusing now_iso when set"""
+        try:
+            fields = _get_position_fields(ctrader_position)
+        except AttributeError:
+            fields = _getattr_position_fields(ctrader_position)
 
-        return {
-            'id': str(getattr(ctrader_position, 'positionId', '')),
-            'type': 'POSITION_TYPE_BUY' if is_buy else 'POSITION_TYPE_SELL',
-            'symbol': mt5_symbol,
-            'magic': int(getattr(ctrader_position, 'label', 0) or 0),
-            'openPrice': entry_price,
-            'currentPrice': current_price,
-            'currentTickValue': symbol_info.get('tickValue', 1),
-            'volume': volume,
-            'swap': getattr(ctrader_position, 'swap', 0),
-            'profit': getattr(ctrader_position, 'profit', 0),
-            'commission': getattr(ctrader_position, 'commission', 0),
-            'clientId': getattr(ctrader_position, 'comment', ''),
-            'stopLoss': getattr(ctrader_position, 'stopLoss', 0),
-            'takeProfit': getattr(ctrader_position, 'takeProfit', 0),
-            'comment': getattr(ctrader_position, 'comment', ''),
-            'updateTime': datetime.fromtimestamp(
-                getattr(ctrader_position, 'utcLastUpdateTimestamp', 0) / 1000
-            ).isoformat() if hasattr(ctrader_position, 'utcLastUpdateTimestamp') else datetime.now().isoformat(),
-            'openTime': datetime.fromtimestamp(
-                getattr(ctrader_position, 'utcTimestamp', 0) / 1000
-            ).isoformat() if hasattr(ctrader_position, 'utcTimestamp') else datetime.now().isoformat(),
-            'realizedProfit': getattr(ctrader_position, 'realizedProfit', 0),
-            'unrealizedProfit': getattr(ctrader_position, 'unrealizedProfit', getattr(ctrader_position, 'profit', 0))
-        }
+        symbol_id = fields[0]
+        try:
+            map_fields = self.position_mappers[symbol_id]
+        except KeyError:
+            map_fields = self._position_mapper_for(symbol_id)
+        return map_fields(fields, now_iso)
+
+    def _position_mapper_for(self, symbol_id: int) -> Callable[..., Dict]:
+        """Build the position mapper for symbol_id, caching it for configured symbols"""
+        symbol_info = self._symbol_info(symbol_id)
+
+        map_fields = _position_mapper(symbol_info.mt5_symbol or f'UNKNOWN_{symbol_id}',
+                                      symbol_info.tick_value)
+        # Unknown ids aren't cached so a stream of bad ids can't grow the cache
+        if symbol_info is not _UNKNOWN_SYMBOL:
+            self.position_mappers[symbol_id] = map_fields
+        return map_fields
 
     def map_order_request(self, metaapi_order: Dict) -> Dict:
         """Convert MetaAPI order format to cTrader format"""
@@ -99,23 +407,14 @@ class CTraderDataMapper:
         # Convert volume (MetaAPI uses lots, cTrader uses volume * 100)
         volume = int((metaapi_order.get('volume', 0)) * 100)
 
-        # Map order type
-        order_type_map = {
-            'ORDER_TYPE_BUY': 1,         # MARKET
-            'ORDER_TYPE_SELL': 1,        # MARKET
-            'ORDER_TYPE_BUY_LIMIT': 2,   # LIMIT
-            'ORDER_TYPE_SELL_LIMIT': 2,  # LIMIT
-            'ORDER_TYPE_BUY_STOP': 3,    # STOP
-            'ORDER_TYPE_SELL_STOP': 3    # STOP
-        }
-
-        # Map trade side
+        # Map order type and trade side
         action_type = metaapi_order.get('actionType', 'ORDER_TYPE_BUY')
-        trade_side = 'BUY' if 'BUY' in action_type else 'SELL'
+        ct_type, trade_side, price_field = (_ACTION_TO_CT.get(action_type)
+                                            or _parse_action_type(action_type))
 
         ctrader_order = {
             'symbolId': symbol_mapping['cTraderId'],
-            'orderType': order_type_map.get(action_type, 1),
+            'orderType': ct_type,
             'tradeSide': trade_side,
             'volume': volume,
             'comment': metaapi_order.get('comment', ''),
@@ -123,10 +422,8 @@ class CTraderDataMapper:
         }
 
         # Add price for limit/stop orders
-        if 'LIMIT' in action_type:
-            ctrader_order['limitPrice'] = metaapi_order.get('openPrice', 0)
-        elif 'STOP' in action_type:
-            ctrader_order['stopPrice'] = metaapi_order.get('openPrice', 0)
+        if price_field:
+            ctrader_order[price_field] = metaapi_order.get('openPrice', 0)
 
         # Add SL/TP if provided
         if metaapi_order.get('stopLoss'):
@@ -140,17 +437,19 @@ class CTraderDataMapper:
         """Convert cTrader account info to MetaAPI format"""
         account_id = str(getattr(ctrader_account, 'accountId', '') or
                         getattr(ctrader_account, 'ctidTraderAccountId', ''))
+        # Equity and free margin default to the balance; read it once
+        balance = getattr(ctrader_account, 'balance', 0)
 
         return {
             'id': account_id,
-            'brokerTime': datetime.now().isoformat(),
+            'brokerTime': _cached_now_iso(),
             'broker': getattr(ctrader_account, 'brokerName', 'cTrader'),
             'currency': getattr(ctrader_account, 'currency', 'USD'),
             'server': getattr(ctrader_account, 'environment', 'demo'),
-            'balance': getattr(ctrader_account, 'balance', 0),
-            'equity': getattr(ctrader_account, 'equity', getattr(ctrader_account, 'balance', 0)),
+            'balance': balance,
+            'equity': getattr(ctrader_account, 'equity', balance),
             'margin': getattr(ctrader_account, 'margin', 0),
-            'freeMargin': getattr(ctrader_account, 'freeMargin', getattr(ctrader_account, 'balance', 0)),
+            'freeMargin': getattr(ctrader_account, 'freeMargin', balance),
             'leverage': getattr(ctrader_account, 'leverage', 100),
             'marginLevel': getattr(ctrader_account, 'marginLevel', 0),
             'tradeAllowed': getattr(ctrader_account, 'tradeAllowed', True),
@@ -160,56 +459,57 @@ class CTraderDataMapper:
 
     def map_order(self, ctrader_order: Any) -> Dict:
         """Convert cTrader order to MetaAPI format"""
-        symbol_info = self.reverse_symbol_mapping.get(ctrader_order.symbolId, {})
-        mt5_symbol = symbol_info.get('mt5Symbol', f'UNKNOWN_{ctrader_order.symbolId}')
+        return self._map_order(ctrader_order, None)
 
-        volume = getattr(ctrader_order, 'volume', 0) / 100
+    def map_orders(self, ctrader_orders: List[Any]) -> List[Dict]:
+        """Convert a batch of cTrader orders to MetaAPI format"""
+        # Resolve the fallback timestamp once for the whole batch
+        now_iso = _cached_now_iso()
+        map_one = self._map_order
+        return [map_one(order, now_iso) for order in ctrader_orders]
 
-        # Map cTrader order type to MetaAPI
-        order_type_map = {
-            1: 'ORDER_TYPE_BUY',      # MARKET
-            2: 'ORDER_TYPE_BUY_LIMIT', # LIMIT
-            3: 'ORDER_TYPE_BUY_STOP',  # STOP
-            4: 'ORDER_TYPE_SELL',      # For SL/TP
-            5: 'ORDER_TYPE_BUY',       # MARKET_RANGE
-            6: 'ORDER_TYPE_BUY_STOP'   # STOP_LIMIT
-        }
+    def _map_order(self, ctrader_order: Any, now_iso: Optional[str]) -> Dict:
+        """Convert a single cTrader order, reusing now_iso when set"""
+        try:
+            fields = _get_order_fields(ctrader_order)
+        except AttributeError:
+            fields = _getattr_order_fields(ctrader_order)
+
+        (symbol_id, volume, ctrader_type, trade_side, order_id, order_status, label,
+         limit_price, stop_price, execution_price, comment, update_ts, open_ts) = fields
 
-        order_type = order_type_map.get(getattr(ctrader_order, 'orderType', 1), 'ORDER_TYPE_BUY')
-        if getattr(ctrader_order, 'tradeSide', 'BUY') == 'SELL':
-            order_type = order_type.replace('BUY', 'SELL')
+        symbol_info = self._symbol_info(symbol_id)
+        mt5_symbol = symbol_info.mt5_symbol or f'UNKNOWN_{symbol_id}'
+
+        volume = volume / 100
+
+        # Map cTrader order type to MetaAPI
+        order_type = _ORDER_TYPE_BY_SIDE.get((ctrader_type, trade_side))
+        if order_type is None:
+            # Type or side outside the table; resolve it the long way
+            order_type = _ORDER_TYPE_MAP_CT_TO_MTA.get(ctrader_type, 'ORDER_TYPE_BUY')
+            if trade_side == 'SELL':
+                order_type = order_type.replace('BUY', 'SELL')
 
         return {
-            'id': str(getattr(ctrader_order, 'orderId', '')),
+            'id': str(order_id),
             'type': order_type,
-            'state': self.map_order_state(getattr(ctrader_order, 'orderStatus', 'PENDING')),
+            'state': self.map_order_state(order_status),
             'symbol': mt5_symbol,
-            'magic': int(getattr(ctrader_order, 'label', 0) or 0),
-            'openPrice': getattr(ctrader_order, 'limitPrice', 0) or getattr(ctrader_order, 'stopPrice', 0),
-            'currentPrice': getattr(ctrader_order, 'executionPrice', 0),
+            'magic': _as_int(label),
+            'openPrice': limit_price or stop_price,
+            'currentPrice': execution_price,
             'volume': volume,
             'currentVolume': volume,
-            'comment': getattr(ctrader_order, 'comment', ''),
-            'clientId': getattr(ctrader_order, 'label', ''),
-            'updateTime': datetime.fromtimestamp(
-                getattr(ctrader_order, 'utcLastUpdateTimestamp', 0) / 1000
-            ).isoformat() if hasattr(ctrader_order, 'utcLastUpdateTimestamp') else datetime.now().isoformat(),
-            'openTime': datetime.fromtimestamp(
-                getattr(ctrader_order, 'utcTimestamp', 0) / 1000
-            ).isoformat() if hasattr(ctrader_order, 'utcTimestamp') else datetime.now().isoformat()
+            'comment': comment,
+            'clientId': label,
+            'updateTime': _ts_iso_or_now(update_ts, now_iso),
+            'openTime': _ts_iso_or_now(open_ts, now_iso)
         }
 
     def map_order_state(self, ctrader_status: str) -> str:
         """Map cTrader order status to MetaAPI state"""
-        state_map = {
-            'PENDING': 'ORDER_STATE_PLACED',
-            'ACCEPTED': 'ORDER_STATE_PLACED',
-            'FILLED': 'ORDER_STATE_FILLED',
-            'CANCELLED': 'ORDER_STATE_CANCELED',
-            'EXPIRED': 'ORDER_STATE_EXPIRED',
-            'REJECTED': 'ORDER_STATE_REJECTED'
-        }
-        return state_map.get(ctrader_status, 'ORDER_STATE_PLACED')
+        return _STATE_MAP.get(ctrader_status, 'ORDER_STATE_PLACED')
 
     def map_symbol_info(self, ctrader_symbol: Any, mt5_symbol: str) -> Dict:
         """Convert cTrader symbol info to MetaAPI format"""
@@ -227,41 +527,52 @@ class CTraderDataMapper:
             'profitCurrency': getattr(ctrader_symbol, 'quoteCurrency', 'USD')
         }
 
-    def map_price_data(self, symbol_id: int, bid: float, ask: float) -> Dict:
-        """Map price/quote data from cTrader to MetaAPI format"""
-        symbol_info = self.reverse_symbol_mapping.get(symbol_id, {})
-        mt5_symbol = symbol_info.get('mt5Symbol', f'UNKNOWN_{symbol_id}')
+    def map_price_data(self, symbol_id: int, bid: float, ask: float,
+                       timestamp: Optional[float] = None) -> Dict:
+        """Map price/quote data from cTrader to MetaAPI format
+
+        timestamp is the quote time in epoch seconds; defaults to now.
+        """
+        symbol_info = self._symbol_info(symbol_id)
+        mt5_symbol = symbol_info.mt5_symbol or f'UNKNOWN_{symbol_id}'
+        broker_time = datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else _cached_now_iso()
 
         return {
             'symbol': mt5_symbol,
             'bid': bid or 0,
             'ask': ask or 0,
-            'brokerTime': datetime.now().isoformat(),
+            'brokerTime': broker_time,
             'spread': abs((ask or 0) - (bid or 0)),
-            'profitTickValue': symbol_info.get('tickValue', 1),
-            'lossTickValue': symbol_info.get('tickValue', 1)
+            'profitTickValue': symbol_info.tick_value,
+            'lossTickValue': symbol_info.tick_value
         }
 
     def map_execution_event(self, execution_event: Any) -> Dict:
         """Convert cTrader execution event to MetaAPI trade format"""
-        symbol_info = self.reverse_symbol_mapping.get(execution_event.symbolId, {})
-        mt5_symbol = symbol_info.get('mt5Symbol', f'UNKNOWN_{execution_event.symbolId}')
+        try:
+            fields = _get_execution_fields(execution_event)
+        except AttributeError:
+            fields = _getattr_execution_fields(execution_event)
+
+        (symbol_id, execution_id, trade_side, label, order_id, position_id, volume,
+         execution_price, commission, swap, profit, timestamp, comment) = fields
+
+        symbol_info = self._symbol_info(symbol_id)
+        mt5_symbol = symbol_info.mt5_symbol or f'UNKNOWN_{symbol_id}'
 
         return {
-            'id': str(getattr(execution_event, 'executionId', '')),
-            'type': f"DEAL_TYPE_{getattr(execution_event, 'tradeSide', 'BUY')}",
+            'id': str(execution_id),
+            'type': f"DEAL_TYPE_{trade_side}",
             'symbol': mt5_symbol,
-            'magic': int(getattr(execution_event, 'label', 0) or 0),
-            'orderId': str(getattr(execution_event, 'orderId', '')),
-            'positionId': str(getattr(execution_event, 'positionId', '')),
-            'volume': getattr(execution_event, 'volume', 0) / 100,
-            'price': getattr(execution_event, 'executionPrice', 0),
-            'commission': getattr(execution_event, 'commission', 0),
-            'swap': getattr(execution_event, 'swap', 0),
-            'profit': getattr(execution_event, 'profit', 0),
-            'time': datetime.fromtimestamp(
-                getattr(execution_event, 'utcTimestamp', 0) / 1000
-            ).isoformat() if hasattr(execution_event, 'utcTimestamp') else datetime.now().isoformat(),
-            'clientId': getattr(execution_event, 'label', ''),
-            'comment': getattr(execution_event, 'comment', '')
-        }
\ No newline at end of file
+            'magic': _as_int(label),
+            'orderId': str(order_id),
+            'positionId': str(position_id),
+            'volume': volume / 100,
+            'price': execution_price,
+            'commission': commission,
+            'swap': swap,
+            'profit': profit,
+            'time': _ts_iso_or_now(timestamp),
+            'clientId': label,
+            'comment': comment
+        }
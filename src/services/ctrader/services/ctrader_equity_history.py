@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+cTrader Equity History
+Fixed-size ring buffer of equity samples for drawdown tracking
+"""
+
+import numpy as np
+
+
+class EquityHistory:
+    """Most recent equity samples for one account, oldest overwritten first"""
+
+    def __init__(self, capacity: int = 10_000):
+        self._values = np.zeros(capacity, np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, equity: float):
+        """Record an equity sample"""
+        self._values[self._next] = equity
+        self._next = (self._next + 1) % len(self._values)
+        self._count = min(self._count + 1, len(self._values))
+
+    def values(self) -> np.ndarray:
+        """Samples in chronological order"""
+        if self._count < len(self._values):
+            return self._values[:self._count]
+        return np.concatenate([self._values[self._next:], self._values[:self._next]])
+
+    def max_drawdown(self) -> float:
+        """Largest peak-to-trough equity drop, as a percentage of the peak"""
+        equity = self.values()
+        if not len(equity):
+            return 0.0
+
+        peak = np.maximum.accumulate(equity)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.where(peak > 0, (peak - equity) / peak, 0.0)
+        return float(drawdown.max() * 100)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+cTrader Price Table
+Struct-of-arrays store for the latest spot price of every symbol
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class PriceTable:
+    """Latest bid/ask per symbol, one row per symbol across parallel arrays"""
+
+    def __init__(self, capacity: int = 256):
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self.bid = np.zeros(capacity, np.float64)
+        self.ask = np.zeros(capacity, np.float64)
+        self.updated = np.full(capacity, -np.inf)  # time.monotonic() of last update
+        self.wall_time = np.zeros(capacity, np.float64)  # time.time() of last update
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def _row(self, symbol: str) -> int:
+        """Get the row for symbol, allocating one if needed"""
+        row = self._index.get(symbol)
+        if row is None:
+            row = len(self._symbols)
+            if row == len(self.bid):
+                self._grow()
+            self._index[symbol] = row
+            self._symbols.append(symbol)
+        return row
+
+    def _grow(self):
+        """Double the capacity of every column"""
+        capacity = len(self.bid)
+        self.bid = np.concatenate([self.bid, np.zeros(capacity, np.float64)])
+        self.ask = np.concatenate([self.ask, np.zeros(capacity, np.float64)])
+        self.updated = np.concatenate([self.updated, np.full(capacity, -np.inf)])
+        self.wall_time = np.concatenate([self.wall_time, np.zeros(capacity, np.float64)])
+
+    def update(self, symbol: str, bid: Optional[float], ask: Optional[float]):
+        """Store the latest quote for symbol; a side passed as None keeps its last value"""
+        row = self._row(symbol)
+        if bid is not None:
+            self.bid[row] = bid
+        if ask is not None:
+            self.ask[row] = ask
+        self.updated[row] = time.monotonic()
+        self.wall_time[row] = time.time()
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> Optional[Tuple[float, float, float]]:
+        """Get (bid, ask, wall_time) for symbol, or None if missing or older than max_age"""
+        row = self._index.get(symbol)
+        if row is None:
+            return None
+        if max_age is not None and time.monotonic() - self.updated[row] >= max_age:
+            return None
+        return float(self.bid[row]), float(self.ask[row]), float(self.wall_time[row])
+
+    def fresh_mask(self, max_age: float) -> np.ndarray:
+        """Boolean mask of rows updated within max_age seconds"""
+        count = len(self._symbols)
+        return (time.monotonic() - self.updated[:count]) < max_age
+
+    def snapshot(self, max_age: Optional[float] = None) -> Dict[str, Tuple[float, float, float]]:
+        """Get (bid, ask, wall_time) for every symbol, optionally only fresh ones"""
+        count = len(self._symbols)
+        if max_age is None:
+            rows = range(count)
+        else:
+            rows = np.flatnonzero(self.fresh_mask(max_age))
+
+        bid = self.bid[:count].tolist()
+        ask = self.ask[:count].tolist()
+        wall_time = self.wall_time[:count].tolist()
+        return {self._symbols[row]: (bid[row], ask[row], wall_time[row]) for row in rows}
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+cTrader Single Flight
+Shares one in-flight coroutine between concurrent callers asking for the same key
+"""
+
+import asyncio
+from typing import Any, Dict
+
+
+def single_flight(inflight: Dict[Any, asyncio.Future], key: Any, fetch):
+    """Await fetch() once for all concurrent callers sharing key"""
+    future = inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(fetch())
+        inflight[key] = future
+
+        def _release(done, key=key):
+            if inflight.get(key) is done:
+                del inflight[key]
+
+        future.add_done_callback(_release)
+
+    # Shield so one cancelled caller does not cancel the shared fetch
+    return asyncio.shield(future)
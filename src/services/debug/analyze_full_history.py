@@ -1,8 +1,90 @@
 #!/usr/bin/env python3
 
+import os
 import re
 from datetime import datetime
 
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def _stats_numpy(profits_arr, initial):
+    """(total, wins, losses, win_amount, loss_amount, largest_win, largest_loss,
+    max_dd, max_dd_pct); pct is taken at the deepest dollar drawdown"""
+    won = profits_arr[profits_arr > 0]
+    lost = profits_arr[profits_arr < 0]
+
+    equity = initial + np.cumsum(profits_arr)
+    peak = np.maximum(np.maximum.accumulate(equity), initial)
+    dd = peak - equity
+    worst = int(dd.argmax()) if len(dd) else 0
+    max_dd = float(dd[worst]) if len(dd) else 0.0
+    max_dd_pct = max_dd / peak[worst] * 100 if max_dd > 0 and peak[worst] > 0 else 0.0
+
+    return (float(profits_arr.sum()), len(won), len(lost), float(won.sum()), float(-lost.sum()),
+            float(profits_arr.max()), float(profits_arr.min()), max_dd, float(max_dd_pct))
+
+
+def _stats_loop(profits_arr, initial):
+    """Every reduction of _stats_numpy fused into one pass over the trades; profits_arr must be non-empty"""
+    total = 0.0
+    wins = 0
+    losses = 0
+    win_amount = 0.0
+    loss_amount = 0.0
+    largest_win = profits_arr[0]
+    largest_loss = profits_arr[0]
+    balance = initial
+    max_balance = initial
+    max_dd = 0.0
+    max_dd_pct = 0.0
+    for i in range(profits_arr.shape[0]):
+        profit = profits_arr[i]
+        total += profit
+        if profit > 0:
+            wins += 1
+            win_amount += profit
+        elif profit < 0:
+            losses += 1
+            loss_amount -= profit
+        if profit > largest_win:
+            largest_win = profit
+        if profit < largest_loss:
+            largest_loss = profit
+
+        balance += profit
+        if balance > max_balance:
+            max_balance = balance
+        dd = max_balance - balance
+        if dd > max_dd:
+            max_dd = dd
+            max_dd_pct = dd / max_balance * 100 if max_balance > 0 else 0.0
+    return (total, wins, losses, win_amount, loss_amount, largest_win, largest_loss,
+            max_dd, max_dd_pct)
+
+
+# Long backtest histories go through the compiled loop; the explicit signature
+# compiles at import and cache=True keeps the machine code on disk. Only the
+# reordering fastmath flags are enabled: the no-inf/no-nan ones would make the
+# comparisons in the loop undefined for such values.
+if HAS_NUMBA:
+    _stats = njit('Tuple((f8, i8, i8, f8, f8, f8, f8, f8, f8))(f8[:], f8)',
+                  cache=True, fastmath={'contract', 'reassoc'})(_stats_loop)
+else:
+    _stats = _stats_numpy
+
+# Per-trade P/L for the full history, stored as a float64 .npy array
+PROFITS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    'data',
+    'goldbuy_profits.npy'
+)
+
 # Full trade data
 trade_data = """51287132    9/29/25 8:05    BUY    XAUUSD    0.01    3804.08    3810.29    0    0    6.21
 51289318    9/29/25 8:54    BUY    XAUUSD    0.01    3805.51    3811.19    0    0    5.68
@@ -10,11 +92,6 @@ trade_data = """51287132    9/29/25 8:05    BUY    XAUUSD    0.01    3804.08
 
 # Parse all the trades
 trades = []
-total_profit = 0
-wins = 0
-losses = 0
-win_amount = 0
-loss_amount = 0
 volumes = []
 swaps_paid = 0
 
@@ -23,21 +100,17 @@ with open('/home/claude-dev/repos/fxtrueup/data/goldbuy_trades.txt', 'r') as f:
     lines = f.readlines()
 
 # Manually count from the history provided
-profits = [3.39, 4.15, -2.96, 11.1, -10.02, 18.36, 4.35, 10.87, 4.2, -2.89, -3.3, 11.2, 4.09, 4.4, 4.02, 3.85, 11.89, 5.28, 4.19, 7.7, 0.78, -59.11, -32.54, -60.34, -44.73, 58.8, 82.98, -47.32, 142.4, -8.12, -51.87, 35.88, 15.36, -18.6, -37.73, -66.09, 17.79, 11.01, 4.33, -9.93, -2.88, 3.85, -6.58, 1.02, 14.87, 7.85, 7.38, 0.44, 4.2, 4.24, -10.58, -24.3, -47.97, -19.01, -54.46, -26.02, -40.15, 68.67, 17.48, 3.7, 31.12, 88.83, 109.68, 7.33, 0.38, 4.38, 14.17, -6.2, 7.48, 0.67, 4.12, 0.76, 7.79, 4.14, 7.39, 0.7, 3.69, 7.36, 0.37, 3.74, -5.58, 1.19, 16.56, -12.16, 11.92, 5.85, 21.58, -43.8, -19.69, -14.39, -9.64, 5.41, 0.54, -24.63, 10.53, -35.04, 20.19, 75.64, 25.66, 15.43, -29.86, 72.18, 62.1, -4.5, 5.59, 7.77, -1.71, 3.14, 13.18, 5.84, 5.96, 5.53, 5.65, 6.03, 6, 6.2, 6.14, 5.69, 5.91, 13.05, -2.04, 8.03, -6.91, 17.82, 3.36, 8.58, 3.45, 5.92, 1.17, 5.96, 10.78, 5.8, 16.16, -4.53, 1.07, 6.1, 11.08, 13.57, -6.61, 18.64, -1.97, 0.68, 8.15, 28.47, 23.75, -16.71, -11.7, -14.48, 0.47, 10.96, 15.89, 5.71, 20.92, 26.62, -9.61, -4.3, 5.56, 6.06, 5.85, 5.01, -20.01, 15.46, 36.34, 5.64, -4.79, 10.54, 25.52, 31.12, -9.7, -15.04, 20.22, -0.17, 6.04, 3.64, 8.61, 7.64, 2.38, 0.16, 5.78, 10.72, 5.79, 8.15, 3.36, 3.31, 8.08, 6.07, 3.51, 8.43, 3.19, 8.26, 5.65, 8.46, 3.31, 5.69, 13.15, 3.45, 8.28, -1.13, 13.38, 8.83, 3.38, -1.91, 5.71, 3.44, 8.07, 20.48, 10.99, -3.99, 6.04, 0.96, 15.71, -8.85, -4.89, 0.54, 15.91, 11.03, 21.16, -10.18, -14.92, 26.1, 5.45, 2.26, 8.08, 11.71, -4.19, 15.44, -4.19, -5.73, 25.65, 12.86, 2.66, -2.62, -7.71, 7.79, -12.71, 20.21, 1.93, 8.16, 3.11, 5.85, 5.58, 6.11, 10.86, 0.82, 6.15, 6.13, 5.96, 5.6, 3.63, 8.46, 14.08, 8.87, 4.29, -1.33, 5.95, 0.7, 10.57, 6.33, 6, 5.92, 13.18, 3.16, 8.3, -1.34, -2.16, -47.41, -87.01, -82.25, -67.58, -77.41, -41.82, -21.42, -51.94, -37.51, -26.9, -31.55, -72.72, -62.4, -57.2, -21.25, 9.18, -32.44, -12.32, 218.64, 135.32, 19.7, 29.18, 122.26, 112.52, 103.8, 93.92, 84.72, 42.94, 54.66, 65.84, 75.24, 8.31, 3.76, 6.08, 3.39, 7.78, 5.32, 3.17, 13.44, 8.24, -2.22, 8.27, 3.08, 3.56, 8.55, 5.59, 13.29, -1.95, -7.32, 18.34, 8.29, 2.97, 5.69, 5.84, -7.06, -1.38, 13.59, 18.9, 3.38, 8.46, 1.02, 10.89, 5.81, 2.99, 8.53, 10.58, 5.21, 0.25, -4.63, 15.77, 5.9, 5.39, 0.4, 10.92, 3.43, 8.65, 6.11, 3.07, 8.17, 5.77, 9.44, 14.14, -1.92, 11.47, 5.12, 6, -1.34, 14.04, 8.5, 3.76, 5.31, 10.45, -0.09, 14.81, 5.23, -5.12, 2.65, 8.83, 5.88, 0.32, 11.58, 6.04, -5.21, 13.28, 5.89, -1.65, -0.01, 9.06, 3.83, -4.84, -20.32, -9.74, -0.12, -25.5, -15.4, 20.89, 5.55, 31.03, 15.73, 35.79, 25.57, 10.29, 11.19, 1.3, 6.79, -15.36, 22.71, 27.38, 15.75, -0.78, 10.37, 5.43, -10.52, -5.08, 0.9, -8.81, 5.82, -14.19, 24.85, 14.49, -4.84, 19.68, 9.98, 5.86, 5.71, 9.82, 4.42, -3.94, 6.15, 10.78, 15.99, 0.51, 8.54, 3.58, 8.37, -1.34, 18.22, 13.41, 3.6, 13.25, 8.52, 3.45, -1.32, -3.92, 16.21, 6.59, 1.44, 11.3, 11.2, 6.35, 1.26, 5.97, 4.09, -1.21, 8.77, 13.6, 5.95, 5.78, 10.51, 0.25, 5.64, 3.53, 8.79, 3.4, 8.67, 5.39, 3.58, 8.85, 5.79, 8.76, 3.82, -1.19, 13.76, 6.21, 6.34, 5.72, 1.04, 6.17, 11.86, 8.79, 3.68, 6.23, 13.7, 3.46, 8.5, -1.32, 3.29, 8.6, 3.38, 8.83, 8.28, 13.57, -7.14, 18.01, 2.98, -1.87, 0.77, 6.24, 11.03, 6.04, 5.7, 6.24, 5.88, 5.86, 6.17, 0.96, 11.33, 3.58, 9.11, 10.82, 0.61, 5.48, 3.23, 8.56, 5.87, 8.3, 3.2, 5.77, 5.83, 6.11, -21.79, -11.64, 8.13, 13.12, -26.5, -5.84, 19.38, 35.22, 24.55, -0.12, 30.62, -15.28, 4.8, 3.61, 8.35, 5.48, 11.09, 1.08, 5.91, 0.88, 10.97, 2.99, 8.69, -2.86, 6.83, 2.02, 5.85, 6.33, 3.63, 14.77, 8.44, -1.77, 6.28, 5.84, 13.49, -1.35, 8.58, 3.9, 6.09, 5.7, 5.75, 6.28, 6.36, 5.76, 6.29, 11.84, 1.14, 6.15, 3.59, 8.5, 13.14, 8.37, 3.18, -2.34, 8.4, 3.47, 5.59, -14.85, -10.26, 16.92, 21.84, 0.18, 11.35, 26.84, -4.88, 8.15, 3.18, 2.69, 8.75, 6.01, -12.55, -7.28, 3.26, 8.01, 13.85, 24.35, 19.1, -2.34, 5.74, 6.12, 0.84, 10.84, 8.3, 3.22, 5.92, 8.82, 3.87, 5.61, 5.52, 8.72, 13.47, -1.59, 3.4, -4.25, 0.52, 16.87, 10.77, 5.72, 6.26, 11.22, 1.03, 8.48, 3.2, 5.71, 6.65, 3.22, 8.32, 5.89, 3.79, 9, 6.22, 6.16, 9.55, 2.58, 18.99, -7.26, 2.97, 13.48, 23.79, -2.2, -13.04, 8.25, 2.99, -0.36, -0.22, 21.48, 4.97, 8.07, -1.39, -54.04, -38.7, -23.78, -13.9, -32.38, -28.03, -42.83, -18.76, -48.36, 5.77, 5.83, 3.57, 8.33, 8.55, 3.31, 0.8, 5.86, 11.17, 5.84, 5.57, 6.03, 10.58, 0.37, 10.9, 5.7, 0.79, 5.87, 5.9, 5.68, 6.27, 5.99, 5.96, 3.45, 8.55, 5.6, 5.88, 5.93, 5.99, 1.01, 10.68, 5.93, 8.73, 3.7, 5.65, 8.61, 3.29, 5.96, 5.96, 3.17, 8.17, -2.27, 13.27, 3.5, 8.11, 3.75, 8.52, 13.76, 3.35, 7.74, -1.99, -2.1, 14.62, 9.05, 3.52, -8.13, 19.39, 17.05, -3.7, 22.42, -10.66, 11.01, -20.69, -15.38, 32.31, 26.74, 0.82, 6.35, 3.35, 8.63, 0.84, 11.55, -4.4, 16.52, -9.19, 21.72, 6.04, 13.65, 3.27, 8.34, -1.88, 10.52, 0.88, 6, 5.85, 3.39, 8.48, 5.59, 5.7, 3.09, 8.31, 5.85, 5.98, 8.75, -1.78, 13.64, 3.66, 0.84, 11.42, 5.77, 6.21, 5.81, 6.21, 5.68, 5.88]
+profits = np.load(PROFITS_PATH)
 
 # Count basic stats
 initial_balance = 5000
-total_profit = sum(profits)
-total_trades = len(profits)
-
-# Count wins and losses
-for p in profits:
-    if p > 0:
-        wins += 1
-        win_amount += p
-    elif p < 0:
-        losses += 1
-        loss_amount += abs(p)
+p = np.asarray(profits, dtype=np.float64)
+total_trades = len(p)
+
+# Totals, win/loss counts, extremes and max drawdown, in one pass when compiled;
+# the drawdown percentage is taken at the deepest dollar drawdown
+(total_profit, wins, losses, win_amount, loss_amount,
+ largest_win, largest_loss, max_dd, max_dd_pct) = _stats(p, float(initial_balance))
 
 # Calculate statistics
 win_rate = (wins / total_trades) * 100
@@ -58,24 +131,6 @@ trading_months = trading_days / 30
 monthly_return = total_return / trading_months
 daily_return = total_return / trading_days
 
-# Max drawdown calculation
-balance = initial_balance
-max_balance = initial_balance
-max_dd = 0
-max_dd_pct = 0
-
-for p in profits:
-    balance += p
-    if balance > max_balance:
-        max_balance = balance
-
-    dd = max_balance - balance
-    dd_pct = (dd / max_balance) * 100 if max_balance > 0 else 0
-
-    if dd > max_dd:
-        max_dd = dd
-        max_dd_pct = dd_pct
-
 print("=" * 60)
 print("GOLDBUYONLY COMPLETE PERFORMANCE ANALYSIS")
 print("=" * 60)
@@ -105,8 +160,8 @@ print(f"Expectancy: ${expectancy:.2f} per trade")
 
 print(f"\n⚠️ RISK METRICS")
 print("-" * 40)
-print(f"Largest Win: ${max(profits):.2f}")
-print(f"Largest Loss: ${min(profits):.2f}")
+print(f"Largest Win: ${largest_win:.2f}")
+print(f"Largest Loss: ${largest_loss:.2f}")
 print(f"Max Drawdown: ${max_dd:.2f} ({max_dd_pct:.2f}%)")
 print(f"Risk/Reward Ratio: 1:{(avg_win/avg_loss):.2f}")
 